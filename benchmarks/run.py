@@ -0,0 +1,250 @@
+"""Time the reporting classes on synthetic projects, see `synthetic.py`,
+and compare the timings with a stored baseline.
+
+Usage:
+    python benchmarks/run.py --scales small medium
+    python benchmarks/run.py --scales small --save
+
+The projects are created once per scale and reused by later runs,
+pass `--regenerate` to create them again. Each benchmark is repeated
+`--repeat` times and the fastest run is reported. Benchmarks slower than
+the baseline by more than `--tolerance` are reported as regressions,
+and the script exits with status 1. Benchmarks which raise an exception
+count as regressions as well, and no baseline is saved from a run
+with failed benchmarks.
+
+The baseline is not part of the repository, as the timings depend on the
+machine. Create it with `--save` before comparing, e.g., on the main
+branch, for all scales you want to compare. Running without a baseline
+for the given scales is an error.
+
+The benchmarks require premise in addition to lca2rmnd,
+see `synthetic.py`.
+"""
+
+# imported first, to report a missing premise installation
+from synthetic import create_project, eidb_label, model, tech_label
+
+from lca2rmnd.data_collection import RemindDataCollection
+from lca2rmnd.reporting import ElectricityLCAReporting, TransportLCAReporting
+
+import brightway2 as bw
+
+from pathlib import Path
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BENCH_DIR = Path(__file__).resolve().parent
+BASELINE = BENCH_DIR / "baseline.json"
+
+scenario = "BAU"
+years = [2020, 2030, 2040]
+
+# parameters of the synthetic projects, see `synthetic.create_project`
+scales = {
+    "small": {"size": 500, "n_variables": 100},
+    "medium": {"size": 5000, "n_variables": 2000},
+    "large": {"size": 20000, "n_variables": 20000},
+}
+
+
+def setup(scale, regenerate=False):
+    """
+    Create (or reuse) the project and REMIND output file for `scale`.
+
+    :return: the project name, the data folder and the midpoint methods
+    :rtype: tuple
+    """
+    project = "lca2rmnd_bench_{}".format(scale)
+    folder = BENCH_DIR / "data" / scale
+    meta = folder / "methods.json"
+    exists = project in bw.projects and meta.exists()
+    if exists:
+        bw.projects.set_current(project)
+        exists = all(eidb_label(model, scenario, year) in bw.databases
+                     and tech_label(scenario, year) in bw.databases
+                     for year in years)
+    if regenerate or not exists:
+        methods = create_project(
+            project, folder, scenario, years, **scales[scale])
+        with open(meta, "w") as f:
+            json.dump(methods, f)
+    with open(meta) as f:
+        methods = [tuple(method) for method in json.load(f)]
+    return project, folder, methods
+
+
+def benchmarks(project, folder, methods):
+    """
+    Return the benchmarks as a dictionary of functions, keyed by name.
+    Every benchmark creates its reporting object, so that no results
+    are reused between runs.
+    """
+    def transport(name, *args):
+        def run():
+            rep = TransportLCAReporting(
+                scenario, years, project, folder, methods)
+            getattr(rep, name)(*args)
+        return run
+
+    def electricity(name, *args):
+        def run():
+            rep = ElectricityLCAReporting(
+                scenario, years, project, folder, methods)
+            getattr(rep, name)(*args)
+        return run
+
+    def supplier_shares():
+        rep = ElectricityLCAReporting(
+            scenario, years, project, folder, methods)
+        db = bw.Database(eidb_label(model, scenario, years[0]))
+        for region in rep.regions:
+            rep.supplier_shares(db, region)
+
+    def uncertainty():
+        rep = TransportLCAReporting(
+            scenario, years, project, folder, methods)
+        directory = tempfile.mkdtemp()
+        try:
+            rep.report_LDV_uncertainty(iterations=20, directory=directory)
+        finally:
+            shutil.rmtree(directory)
+
+    def remind_data(cache):
+        def run():
+            if not cache:
+                path = folder / "remind_{}.mif.parquet".format(scenario)
+                if path.exists():
+                    os.remove(path)
+            RemindDataCollection(scenario, folder)
+        return run
+
+    return {
+        "RemindDataCollection (parse)": remind_data(False),
+        "RemindDataCollection (cached)": remind_data(True),
+        "supplier_shares": supplier_shares,
+        "report_LDV_LCA": transport("report_LDV_LCA"),
+        "report_LDV_uncertainty": uncertainty,
+        "report_LDV_sweep": transport(
+            "report_LDV_sweep", [0., 0.25, 0.5, 0.75, 1.], [0.5, 1.]),
+        "report_contributions (transport)":
+            transport("report_contributions"),
+        "report_materials": transport("report_materials"),
+        "report_materials_cube": transport("report_materials_cube"),
+        "report_direct_emissions": transport("report_direct_emissions"),
+        "report_midpoint": transport("report_midpoint"),
+        "report_endpoint": transport("report_endpoint"),
+        "report_midpoint_to_endpoint":
+            transport("report_midpoint_to_endpoint"),
+        "report_sectoral_LCA": electricity("report_sectoral_LCA"),
+        "report_tech_LCA": electricity("report_tech_LCA", years[0]),
+        "report_tech_LCA_cube": electricity("report_tech_LCA_cube", years),
+        "report_contributions (electricity)":
+            electricity("report_contributions"),
+    }
+
+
+def run(scale, repeat=3, regenerate=False, only=None):
+    """
+    Run the benchmarks for `scale`.
+
+    :return: the fastest run of each benchmark in seconds,
+        `None` for failed benchmarks.
+    :rtype: dict
+    """
+    project, folder, methods = setup(scale, regenerate)
+    result = {}
+    for name, func in benchmarks(project, folder, methods).items():
+        if only and name not in only:
+            continue
+        timings = []
+        try:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                func()
+                timings.append(time.perf_counter() - start)
+        except Exception as e:
+            print("{} failed: {!r}".format(name, e))
+            result[name] = None
+            continue
+        result[name] = min(timings)
+    return result
+
+
+def compare(results, baseline, tolerance):
+    """
+    Print the timings next to the baseline.
+
+    :return: the benchmarks which got slower by more than `tolerance`.
+    :rtype: list
+    """
+    regressions = []
+    print("{:8} {:32} {:>10} {:>10} {:>8}".format(
+        "scale", "benchmark", "time [s]", "baseline", "ratio"))
+    for scale, timings in results.items():
+        for name, seconds in timings.items():
+            base = baseline.get(scale, {}).get(name)
+            ratio = seconds / base if seconds and base else None
+            print("{:8} {:32} {:>10} {:>10} {:>8}".format(
+                scale, name,
+                "failed" if seconds is None else "{:.3f}".format(seconds),
+                "-" if base is None else "{:.3f}".format(base),
+                "-" if ratio is None else "{:.2f}".format(ratio)))
+            if ratio is not None and ratio > 1 + tolerance:
+                regressions.append((scale, name))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", nargs="+", default=["small"],
+                        choices=list(scales))
+    parser.add_argument("--only", nargs="+",
+                        help="names of the benchmarks to run")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed slowdown relative to the baseline")
+    parser.add_argument("--regenerate", action="store_true",
+                        help="create the synthetic projects again")
+    parser.add_argument("--save", action="store_true",
+                        help="store the timings as new baseline")
+    args = parser.parse_args()
+
+    baseline = {}
+    if BASELINE.exists():
+        with open(BASELINE) as f:
+            baseline = json.load(f)
+    missing = [scale for scale in args.scales if scale not in baseline]
+    if missing and not args.save:
+        sys.exit(
+            "No baseline for the scales {} found at {}. Create it with\n"
+            "    python benchmarks/run.py --scales {} --save\n"
+            "on a reference checkout, e.g., the main branch."
+            .format(missing, BASELINE, " ".join(missing)))
+
+    results = {scale: run(scale, args.repeat, args.regenerate, args.only)
+               for scale in args.scales}
+
+    regressions = compare(results, baseline, args.tolerance)
+    failures = [(scale, name) for scale, timings in results.items()
+                for name, seconds in timings.items() if seconds is None]
+
+    if failures:
+        print("Failed: {}".format(failures))
+        if args.save:
+            print("Baseline not saved, as some benchmarks failed.")
+        sys.exit(1)
+    if args.save:
+        for scale, timings in results.items():
+            baseline.setdefault(scale, {}).update(timings)
+        with open(BASELINE, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print("Baseline saved to {}.".format(BASELINE))
+    elif regressions:
+        print("Regressions: {}".format(regressions))
+        sys.exit(1)
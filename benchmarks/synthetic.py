@@ -0,0 +1,352 @@
+"""Create synthetic brightway2 projects and REMIND output files
+for benchmarking the reporting classes, without ecoinvent.
+
+Each year database contains
+
+* `size` generic background activities with random supply chains,
+* power plants and low and medium voltage market groups for
+  electricity in all REMIND regions,
+* fleet average passenger car activities for all drivetrains
+  in all REMIND regions.
+
+The power plants are also copied to a database named
+"ecoinvent_<scenario>_<year>", which is read by
+`ElectricityLCAReporting.report_tech_LCA`.
+
+Usage example:
+    from synthetic import create_project
+
+    methods = create_project(
+        "lca2rmnd_bench", "bench_data", scenario="BAU",
+        years=[2020, 2030], size=2000)
+    rep = TransportLCAReporting(
+        "BAU", [2020, 2030], "lca2rmnd_bench", Path("bench_data"), methods)
+
+The benchmarks require premise, which is used by the reporting classes
+but is not installed with lca2rmnd.
+"""
+
+try:
+    from premise.utils import eidb_label
+except ImportError:
+    raise ImportError(
+        "The benchmarks require premise, install it with"
+        " `pip install premise`.")
+
+from lca2rmnd.reporting import ElectricityLCAReporting, TransportLCAReporting
+
+import brightway2 as bw
+import numpy as np
+import pandas as pd
+
+from pathlib import Path
+
+model = "remind"
+
+remind_regions = [
+    'LAM', 'OAS', 'SSA', 'EUR',
+    'NEU', 'MEA', 'REF', 'CAZ',
+    'CHA', 'IND', 'JPN', 'USA']
+
+# years of the REMIND output file
+remind_years = list(range(2005, 2061, 5)) + list(range(2070, 2111, 10)) \
+    + [2130, 2150]
+
+biosphere_db = "biosphere3"
+emissions = [
+    "Carbon dioxide, fossil", "Methane, fossil", "Dinitrogen monoxide",
+    "Nitrogen oxides", "Sulfur dioxide", "Particulates, < 2.5 um",
+    "Carbon monoxide, fossil", "Ammonia"]
+resources = [
+    "Copper, in ground", "Nickel, in ground", "Cobalt, in ground",
+    "Lithium, in ground", "Aluminium, in ground", "Iron, in ground",
+    "Manganese, in ground", "Platinum, in ground"]
+
+# at least one activity for each of the powerplant filters of
+# `premise.InventorySet`, see also `tests/test_selector.py`
+powerplants = [
+    "Electricity, at BIGCC power plant 450MW, pre, pipeline 200km,"
+    " storage 1000m/2025",
+    "Electricity, at BIGCC power plant 450MW, no CCS/2025",
+    "Electricity, at power plant/lignite, IGCC, no CCS/2025",
+    "Electricity, at power plant/hard coal, pre, pipeline 200km,"
+    " storage 1000m/2025",
+    "Electricity, at power plant/hard coal, post, pipeline 200km,"
+    " storage 1000m/2025",
+    "Electricity, at power plant/natural gas, pre, pipeline 200km,"
+    " storage 1000m/2025",
+    "heat and power co-generation, biogas, gas engine, label-certified",
+    "electricity production, hard coal",
+    "electricity production, lignite",
+    "heat and power co-generation, hard coal",
+    "electricity production, natural gas, conventional power plant",
+    "electricity production, natural gas, combined cycle power plant",
+    "heat and power co-generation, natural gas, conventional power plant,"
+    " 100MW electrical",
+    "electricity production, deep geothermal",
+    "electricity production, hydro, reservoir, tropical region",
+    "electricity production, hydro, run-of-river",
+    "electricity production, nuclear, pressure water reactor",
+    "electricity production, oil",
+    "electricity production, solar thermal parabolic trough, 50 MW",
+    "electricity production, photovoltaic, 3kWp facade installation,"
+    " multi-Si, laminated, integrated",
+    "electricity production, photovoltaic, 3kWp slanted-roof installation,"
+    " multi-Si, panel, mounted",
+    "electricity production, wind, 2.3MW turbine, precast concrete tower,"
+    " onshore",
+    "electricity production, wind, 1-3MW turbine, onshore"]
+powerplant_locations = ["RoW", "RER", "DE", "US", "CN", "IN", "BR", "JP"]
+
+midpoint_group = "ReCiPe Midpoint (H) V1.13"
+endpoint_group = "ReCiPe Endpoint (H,A) (obsolete)"
+materials_method = ('ILCD 2.0 2018 midpoint',
+                    'resources', 'minerals and metals')
+
+
+def car_names():
+    """
+    Return the drivetrain names of the fleet average car activities.
+    """
+    names = []
+    for tech in TransportLCAReporting.techmap.values():
+        names.extend(tech.values() if isinstance(tech, dict) else [tech])
+    return names
+
+
+def write_biosphere():
+    """
+    Write the biosphere database with all emissions and resources.
+
+    :return: the keys of the emissions and the resources
+    :rtype: tuple
+    """
+    data = {}
+    for idx, name in enumerate(emissions):
+        data[(biosphere_db, "e{}".format(idx))] = {
+            "name": name, "unit": "kilogram", "type": "emission",
+            "categories": ("air",)}
+    for idx, name in enumerate(resources):
+        data[(biosphere_db, "r{}".format(idx))] = {
+            "name": name, "unit": "kilogram", "type": "natural resource",
+            "categories": ("natural resource", "in ground")}
+    bw.Database(biosphere_db).write(data)
+    return ([key for key in data if key[1].startswith("e")],
+            [key for key in data if key[1].startswith("r")])
+
+
+def write_methods(emission_keys, resource_keys, n_midpoints=18, seed=0):
+    """
+    Write LCIA methods with random characterization factors: `n_midpoints`
+    midpoint methods, the ILCD minerals and metals method used for the
+    material report and a set of endpoint methods.
+
+    :return: the midpoint methods
+    :rtype: list
+    """
+    rng = np.random.default_rng(seed)
+    flows = emission_keys + resource_keys
+
+    def write(method, keys):
+        bw.Method(method).register()
+        bw.Method(method).write(
+            [(key, float(rng.uniform(0.1, 10.))) for key in keys])
+
+    midpoints = []
+    for idx in range(n_midpoints):
+        method = (midpoint_group, "category {}".format(idx), "indicator")
+        write(method, [flows[i] for i in rng.choice(
+            len(flows), size=len(flows) // 2, replace=False)])
+        midpoints.append(method)
+    write(materials_method, resource_keys)
+    for area in ["human health", "ecosystem quality", "resources"]:
+        write((endpoint_group, area, "total"), flows)
+        write((endpoint_group, area, "{} impacts".format(area)), flows)
+    return midpoints
+
+
+def year_database(scenario, year, size, emission_keys, resource_keys,
+                  density=5, seed=0):
+    """
+    Create the data of a synthetic year database. The supply chains are
+    the same for all years, the exchange amounts change slightly from
+    year to year.
+
+    :param size: number of background activities.
+    :type size: int
+    :param density: number of technosphere inputs per background activity.
+    :type density: int
+    :rtype: dict
+    """
+    name = eidb_label(model, scenario, year)
+    rng = np.random.default_rng(seed)
+    noise = np.random.default_rng([seed, year])
+    flow_names = dict(zip(emission_keys + resource_keys,
+                          emissions + resources))
+
+    def exchange(key, amount, kind="technosphere"):
+        amount = float(amount * noise.uniform(0.95, 1.05))
+        exc = {"input": key, "amount": amount, "type": kind}
+        if kind == "biosphere":
+            exc["name"] = flow_names[key]
+        if kind == "technosphere" and amount > 0:
+            exc.update({"uncertainty type": 2, "loc": np.log(amount),
+                        "scale": 0.1})
+        return exc
+
+    def activity(code, act_name, product, location, unit, exchanges):
+        data[(name, code)] = {
+            "name": act_name, "reference product": product,
+            "location": location, "unit": unit,
+            "exchanges": [{"input": (name, code), "amount": 1.,
+                           "type": "production"}] + exchanges}
+        return (name, code)
+
+    data = {}
+    flows = emission_keys + resource_keys
+    background = [(name, "b{}".format(idx)) for idx in range(size)]
+    for idx in range(size):
+        inputs = rng.choice(size, size=min(density, size), replace=False)
+        exchanges = [
+            exchange(background[i], rng.uniform(0, 0.5 / density))
+            for i in inputs if i != idx]
+        exchanges += [
+            exchange(flows[i], rng.uniform(0, 1), "biosphere")
+            for i in rng.choice(len(flows), 3, replace=False)]
+        activity("b{}".format(idx), "background activity {}".format(idx),
+                 "product {}".format(idx), "GLO", "kilogram", exchanges)
+
+    def supply_chain(n=density):
+        return [exchange(background[i], rng.uniform(0, 1))
+                for i in rng.choice(size, size=min(n, size), replace=False)]
+
+    plants = []
+    for p, plant in enumerate(powerplants):
+        for location in powerplant_locations:
+            plants.append(activity(
+                "p{}_{}".format(p, location), plant,
+                "electricity, high voltage", location, "kilowatt hour",
+                supply_chain() + [exchange(
+                    emission_keys[0], rng.uniform(0, 1), "biosphere")]))
+
+    for region in remind_regions:
+        shares = rng.dirichlet(np.ones(len(plants)))
+        medium = activity(
+            "mv_{}".format(region),
+            "market group for electricity, medium voltage",
+            "electricity, medium voltage", region, "kilowatt hour",
+            [exchange(plant, share) for plant, share in zip(plants, shares)])
+        low = activity(
+            "lv_{}".format(region),
+            "market group for electricity, low voltage",
+            "electricity, low voltage", region, "kilowatt hour",
+            [exchange(medium, 1.05)])
+        for c, car in enumerate(car_names()):
+            exchanges = supply_chain() + [
+                exchange(flow, rng.uniform(0, 0.2), "biosphere")
+                for flow in emission_keys[:4]]
+            if "electric" in car:
+                exchanges.append(exchange(low, rng.uniform(0.1, 0.3)))
+            activity(
+                "car{}_{}".format(c, region),
+                "transport, passenger car, fleet average, {}, {}"
+                .format(car, year),
+                "transport, passenger car, fleet average, {}".format(car),
+                region, "kilometer", exchanges)
+    return data
+
+
+def tech_label(scenario, year):
+    """
+    Return the name of the database read by
+    :meth:`lca2rmnd.reporting.ElectricityLCAReporting.report_tech_LCA`.
+    """
+    return "_".join(["ecoinvent", scenario, str(year)])
+
+
+def tech_database(scenario, year, data):
+    """
+    Copy the power plants of the year database `data`, see
+    :func:`year_database`, to the database of :func:`tech_label`.
+    The inputs of the copies stay linked to the year database.
+
+    :rtype: dict
+    """
+    name = tech_label(scenario, year)
+    result = {}
+    for (_, code), act in data.items():
+        if not code.startswith("p"):
+            continue
+        exchanges = [
+            dict(exc, input=(name, code)) if exc["type"] == "production"
+            else exc for exc in act["exchanges"]]
+        result[(name, code)] = dict(act, exchanges=exchanges)
+    return result
+
+
+def write_mif(scenario, folder, n_variables=0, seed=0):
+    """
+    Write a synthetic REMIND output file with the variables
+    used by the reporting classes and `n_variables` other variables.
+
+    :return: the path of the file
+    :rtype: pathlib.Path
+    """
+    rng = np.random.default_rng(seed)
+    variables = [(var, "bn pkm/yr")
+                 for var in TransportLCAReporting.variables]
+    variables += [(var, "EJ/yr")
+                  for var in ElectricityLCAReporting.remind_variables]
+    variables += [("Synthetic|Variable {}".format(idx), "unit")
+                  for idx in range(n_variables)]
+    rows = [["REMIND", scenario, region, var, unit]
+            + list(rng.uniform(0, 100, len(remind_years)))
+            for region in remind_regions + ["World"]
+            for var, unit in variables]
+    df = pd.DataFrame(
+        rows, columns=["Model", "Scenario", "Region", "Variable", "Unit"]
+        + remind_years)
+    # REMIND output files end each line with a separator
+    df[""] = ""
+    path = Path(folder) / "remind_{}.mif".format(scenario)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(path, sep=";", index=False)
+    return path
+
+
+def create_project(project_name, folder, scenario="BAU", years=(2020, 2030),
+                   size=1000, density=5, n_variables=0, n_midpoints=18,
+                   seed=0):
+    """
+    Create a synthetic brightway2 project and REMIND output files.
+    Existing databases of the project are deleted.
+
+    :param str project_name: name of the brightway2 project.
+    :param str folder: folder for the REMIND output files.
+    :param scenario: name of the scenario, or a list of names.
+    :type scenario: Union[str, list]
+    :param list years: years to create databases for.
+    :param int size: number of background activities per database.
+    :param int density: technosphere inputs per background activity.
+    :param int n_variables: number of additional REMIND variables.
+    :param int n_midpoints: number of midpoint methods.
+    :return: the midpoint methods
+    :rtype: list
+    """
+    bw.projects.set_current(project_name)
+    for db in list(bw.databases):
+        del bw.databases[db]
+    bw.methods.clear()
+
+    emission_keys, resource_keys = write_biosphere()
+    methods = write_methods(emission_keys, resource_keys, n_midpoints, seed)
+    scenarios = [scenario] if isinstance(scenario, str) else scenario
+    for scenario in scenarios:
+        for year in years:
+            data = year_database(scenario, year, size, emission_keys,
+                                 resource_keys, density, seed)
+            bw.Database(eidb_label(model, scenario, year)).write(data)
+            bw.Database(tech_label(scenario, year)).write(
+                tech_database(scenario, year, data))
+        write_mif(scenario, folder, n_variables, seed)
+    return methods
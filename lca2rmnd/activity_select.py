@@ -1,5 +1,7 @@
 from bw2data.backends.peewee.proxies import Activity, ActivityDataset as Act
 from functools import reduce
+import numpy as np
+import pandas as pd
 
 class ActivitySelector():
     """
@@ -10,6 +12,39 @@ class ActivitySelector():
     :param db: A lice cycle inventory database
     :type db: brightway2 database object
     """
+    def __init__(self):
+        self.tables = {}
+
+    def table(self, db):
+        """
+        Return the in-memory :class:`ActivityTable` of `db`.
+        The table is loaded on first use.
+
+        :param db: A brightway2 database.
+        :type db: brightway2.Database
+        :rtype: ActivityTable
+        """
+        if db.name not in self.tables:
+            self.tables[db.name] = ActivityTable(db)
+        return self.tables[db.name]
+
+    def select_all(self, db, filters, locs=[]):
+        """
+        Select the activities for several filters at once using the
+        in-memory table of `db`, see :meth:`ActivityTable.select_all`.
+
+        :param db: A brightway2 database.
+        :type db: brightway2.Database
+        :param filters: dictionary with filter names as keys and filter
+            specifications (keyword arguments of :meth:`create_expr`) as values.
+        :type filters: dict
+        :param locs: optional, list of ecoinvent locations.
+        :type locs: list
+        :return: activity keys for each filter name
+        :rtype: dict
+        """
+        return self.table(db).select_all(filters, locs)
+
     def create_expr(self, fltr={}, mask={}, filter_exact=False, mask_exact=False):
         """
         Create a :class:`peewee.Expression` from a filter dictionary.
@@ -96,3 +131,100 @@ class ActivitySelector():
         if len(locs) > 0:
             expr = expr & (Act.location.in_(locs))
         return Act.select().where(expr & (Act.database == db.name))
+
+
+class ActivityTable():
+    """
+    In-memory alternative to the SQL queries of :class:`ActivitySelector`.
+
+    Loads the name, product and location of all activities of a database
+    with a single query and evaluates filter dictionaries as vectorized
+    string operations. Like the SQL backend, *startswith* and *contains*
+    matches are case-insensitive, exact matches are not.
+
+    :ivar df: a dataframe with the columns `database`, `code`, `name`,
+        `product` and `location`.
+    :vartype df: pandas.DataFrame
+    """
+    fields = ["database", "code", "name", "product", "location"]
+
+    def __init__(self, db):
+        self.df = pd.DataFrame(
+            list(Act.select(*[getattr(Act, f) for f in self.fields])
+                 .where(Act.database == db.name).tuples()),
+            columns=self.fields)
+        self._lower = {}
+
+    def _column(self, field, exact):
+        """Return a column, lower case for inexact matches."""
+        if field == "reference product":
+            field = "product"
+        if exact:
+            return self.df[field]
+        if field not in self._lower:
+            self._lower[field] = self.df[field].str.lower()
+        return self._lower[field]
+
+    def mask(self, fltr={}, mask={}, filter_exact=False, mask_exact=False):
+        """
+        Evaluate a filter dictionary on all activities.
+        The arguments are the same as for
+        :meth:`ActivitySelector.create_expr`.
+
+        :return: a boolean array, `True` for selected activities.
+        :rtype: numpy.ndarray
+        """
+        # default field is name
+        if type(fltr) == list or type(fltr) == str:
+            fltr = {"name": fltr}
+        if type(mask) == list or type(mask) == str:
+            mask = {"name": mask}
+
+        assert len(fltr) > 0, "Filter dict must not be empty."
+
+        slct = np.ones(len(self.df), dtype=bool)
+        for field, condition in fltr.items():
+            col = self._column(field, filter_exact)
+            if type(condition) != list:
+                condition = [condition]
+            if filter_exact:
+                slct &= col.isin(condition).values
+            else:
+                slct &= col.str.startswith(
+                    tuple(c.lower() for c in condition), na=False).values
+
+        for field, condition in mask.items():
+            col = self._column(field, mask_exact)
+            if type(condition) != list:
+                condition = [condition]
+            slct &= col.notna().values
+            for c in condition:
+                if mask_exact:
+                    slct &= (col != c).values
+                else:
+                    slct &= ~col.str.contains(
+                        c.lower(), regex=False, na=False).values
+        return slct
+
+    def select_all(self, filters, locs=[]):
+        """
+        Select the activities for several filters at once.
+
+        :param filters: dictionary with filter names as keys and filter
+            specifications (keyword arguments of :meth:`mask`) as values,
+            e.g., :attr:`premise.InventorySet.powerplant_filters`.
+        :type filters: dict
+        :param locs: optional, list of ecoinvent locations.
+        :type locs: list
+        :return: activity keys for each filter name
+        :rtype: dict
+        """
+        assert type(locs) == list
+        at_locs = self.df.location.isin(locs).values if locs \
+            else np.ones(len(self.df), dtype=bool)
+        keys = np.array(list(zip(self.df.database, self.df.code)),
+                        dtype=object).reshape(len(self.df), 2)
+        return {
+            name: [tuple(key) for key in keys[self.mask(**fltr) & at_locs]]
+            for name, fltr in filters.items()
+        }
@@ -0,0 +1,246 @@
+import brightway2 as bw
+
+from pathlib import Path
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class ScoreCache():
+    """
+    Persistent cache of LCA scores in an SQLite file.
+
+    Scores are stored under a hash of the demand (activity keys and
+    amounts), the LCIA method and the modification stamps of all
+    databases involved in the calculation, as well as of the processed
+    method file. Rewriting a database therefore makes all scores
+    calculated from its previous version unreachable;
+    :meth:`invalidate` additionally removes them from the file.
+
+    The number of stored scores is bounded by `max_entries`. When the
+    bound is exceeded, the least recently used scores are evicted.
+    The number of scores is counted when the file is opened and then
+    kept up to date by :meth:`set`, so scores stored by other processes
+    in the meantime are only taken into account on the next opening.
+
+    The cache can be shared between threads. Each thread opens its own
+    connection to the file, as SQLite connections can only be used in
+    the thread that created them.
+
+    :ivar path: location of the cache file, defaults to `scores.sqlite`
+        in the `lca2rmnd` directory of the current brightway2 project.
+    :vartype path: pathlib.Path
+    :ivar max_entries: maximum number of scores to keep.
+    :vartype max_entries: int
+    """
+    def __init__(self, path=None, max_entries=1000000):
+        if path is None:
+            path = Path(bw.projects.request_directory("lca2rmnd")) \
+                / "scores.sqlite"
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self._count = 0
+        self._local = threading.local()
+        # guards the count of scores
+        self._lock = threading.RLock()
+
+    def __getstate__(self):
+        # connections are opened again in worker processes
+        state = self.__dict__.copy()
+        del state["_local"]
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+        self._lock = threading.RLock()
+
+    @property
+    def connection(self):
+        """The connection of the current thread, opened on first use."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(str(self.path), timeout=60)
+            with connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS scores ("
+                    "key TEXT PRIMARY KEY, database TEXT, "
+                    "score REAL, accessed REAL)")
+                connection.execute(
+                    "CREATE INDEX IF NOT EXISTS scores_accessed "
+                    "ON scores (accessed)")
+                connection.execute(
+                    "CREATE INDEX IF NOT EXISTS scores_database "
+                    "ON scores (database)")
+            self._local.connection = connection
+            with self._lock:
+                self._count = len(self)
+        return connection
+
+    def _databases(self, names):
+        """
+        Return the names of the databases in `names` together with
+        all databases they depend on.
+        """
+        result = set()
+        todo = list(names)
+        while todo:
+            name = todo.pop()
+            if name not in result and name in bw.databases:
+                result.add(name)
+                todo.extend(bw.databases[name].get("depends", []))
+        return result
+
+    def database(self, demand):
+        """
+        Return the names of the databases of the activities in `demand`.
+
+        :rtype: list
+        """
+        return sorted({getattr(act, "key", act)[0] for act in demand})
+
+    def fingerprint(self, demand):
+        """
+        Return the modification stamps of all databases
+        needed to calculate `demand`.
+
+        :param demand: a brightway2 demand dictionary.
+        :type demand: dict
+        :rtype: list
+        """
+        names = {getattr(act, "key", act)[0] for act in demand}
+        return sorted(
+            (name, bw.databases[name].get("modified"))
+            for name in self._databases(names))
+
+    def keys(self, demand, methods):
+        """
+        Return the cache keys for the scores of `demand`
+        for each of the `methods`.
+
+        :param demand: a brightway2 demand dictionary.
+        :type demand: dict
+        :param methods: list of brightway2 method tuples.
+        :type methods: list
+        :return: one key per method
+        :rtype: list
+        """
+        base = self._base(demand)
+        result = []
+        for method in methods:
+            fp = bw.Method(method).filepath_processed()
+            stamp = os.stat(fp).st_mtime_ns if os.path.exists(fp) else None
+            result.append(hashlib.sha1(json.dumps(
+                base + [list(method), stamp]).encode()).hexdigest())
+        return result
+
+    def flow_keys(self, demand, flows):
+        """
+        Return the cache keys for the aggregated biosphere flows
+        of `demand`.
+
+        :param demand: a brightway2 demand dictionary.
+        :type demand: dict
+        :param flows: biosphere flow keys.
+        :type flows: list
+        :return: one key per flow
+        :rtype: list
+        """
+        base = self._base(demand)
+        return [hashlib.sha1(json.dumps(
+                    base + ["biosphere", list(flow)]).encode()).hexdigest()
+                for flow in flows]
+
+    def _base(self, demand):
+        """Databases and demanded amounts, the common part of all keys."""
+        return [
+            self.fingerprint(demand),
+            sorted([list(getattr(act, "key", act)), repr(float(amount))]
+                   for act, amount in demand.items())
+        ]
+
+    def get(self, keys):
+        """
+        Look up the scores for `keys`.
+
+        :param keys: cache keys as returned by :meth:`keys`.
+        :type keys: list
+        :return: the scores, `None` for keys which are not in the cache.
+        :rtype: list
+        """
+        found = {}
+        with self.connection as con:
+            # stay below the SQLite limit for host parameters
+            for idx in range(0, len(keys), 500):
+                chunk = keys[idx:idx + 500]
+                marks = ",".join("?" * len(chunk))
+                found.update(con.execute(
+                    "SELECT key, score FROM scores WHERE key IN ({})"
+                    .format(marks), chunk).fetchall())
+                con.execute(
+                    "UPDATE scores SET accessed = ? WHERE key IN ({})"
+                    .format(marks), [time.time()] + chunk)
+        return [found.get(key) for key in keys]
+
+    def set(self, keys, scores, database=None):
+        """
+        Store `scores` under `keys` and evict the least recently
+        used scores if the cache is full.
+
+        :param keys: cache keys as returned by :meth:`keys`.
+        :type keys: list
+        :param scores: the scores, in the same order as `keys`.
+        :type scores: list
+        :param database: name (or list of names) of the databases the
+            scores belong to, see :meth:`database`.
+        :type database: Union[str, list]
+        """
+        if isinstance(database, str):
+            database = [database]
+        # stored as "|name|...|", see `invalidate`
+        database = "|{}|".format("|".join(database)) if database else None
+        now = time.time()
+        with self._lock, self.connection as con:
+            for idx in range(0, len(keys), 500):
+                chunk = keys[idx:idx + 500]
+                existing = con.execute(
+                    "SELECT COUNT(*) FROM scores WHERE key IN ({})"
+                    .format(",".join("?" * len(chunk))), chunk).fetchone()[0]
+                self._count += len(chunk) - existing
+            con.executemany(
+                "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?)",
+                [(key, database, float(score), now)
+                 for key, score in zip(keys, scores)])
+            excess = self._count - self.max_entries
+            if excess > 0:
+                con.execute(
+                    "DELETE FROM scores WHERE key IN ("
+                    "SELECT key FROM scores ORDER BY accessed LIMIT ?)",
+                    (excess,))
+                self._count -= excess
+
+    def invalidate(self, database):
+        """
+        Remove all scores calculated for activities of `database`.
+
+        :param database: name of a brightway2 database.
+        :type database: str
+        """
+        with self._lock, self.connection as con:
+            self._count -= con.execute(
+                "DELETE FROM scores WHERE instr(database, ?) > 0",
+                ("|{}|".format(database),)).rowcount
+
+    def clear(self):
+        """Remove all scores from the cache."""
+        with self._lock, self.connection as con:
+            con.execute("DELETE FROM scores")
+            self._count = 0
+
+    def __len__(self):
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM scores").fetchone()[0]
@@ -1,16 +1,59 @@
 from . import DATA_DIR
 
+import json
 import os
 import pandas as pd
 import xarray as xr
 import numpy as np
 from glob import glob
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+
 class RemindDataCollection():
-    """Manage access to the REMIND output file."""
+    """
+    Manage access to the REMIND output file.
+
+    The `.mif` file is read in chunks of `chunksize` lines, keeping only
+    the rows matching the `variables`, `regions` and `years` selectors.
+    Selectors default to `None`, i.e., all entries. Variables ending in
+    `|`, e.g. `ES|Transport|`, select all variables starting with that
+    prefix.
+
+    The parsed data is cached in a Parquet file next to the `.mif` file,
+    which is used as long as the size and modification time of the
+    `.mif` file do not change. All selectors are then pushed down to
+    the Parquet reader, so only the selected rows are loaded into
+    memory. Caching requires `pyarrow` and is
+    skipped silently if it is missing or the folder is not writable.
 
-    def __init__(self, scenario, filepath_remind_files=None):
+    :ivar cache: use the Parquet cache, defaults to `True`.
+    :vartype cache: bool
+    :ivar variables: REMIND variables or variable prefixes to read.
+    :vartype variables: list
+    :ivar regions: REMIND regions to read.
+    :vartype regions: list
+    :ivar years: years to read.
+    :vartype years: list
+    """
+
+    schema_columns = ["Region", "Variable", "Unit"]
+
+    def __init__(self, scenario, filepath_remind_files=None, cache=True,
+                 variables=None, regions=None, years=None,
+                 chunksize=100000):
         self.scenario = scenario
+        self.cache = cache and pq is not None
+        self.variables = None if variables is None else list(variables)
+        self.regions = None if regions is None else list(regions)
+        self.years = None if years is None else [int(yr) for yr in years]
+        self.chunksize = chunksize
 
         filename = self.scenario + ".mif"
         filepath_remind_files = (filepath_remind_files or DATA_DIR / "remind" )
@@ -23,28 +66,146 @@ class RemindDataCollection():
             raise FileNotFoundError("No scenario output file found for scenario " + scenario)
         self.data = self.get_remind_data()
 
+    @property
+    def cache_path(self):
+        """Location of the Parquet cache for the `.mif` file."""
+        return self.rmndpath.with_name(self.rmndpath.name + ".parquet")
+
+    def _stamp(self):
+        """Size and modification time of the `.mif` file."""
+        stat = os.stat(self.rmndpath)
+        return json.dumps({"size": stat.st_size,
+                           "mtime": stat.st_mtime_ns}).encode()
+
+    def _select(self, df):
+        """Return the rows of `df` matching the selectors."""
+        mask = np.ones(len(df), dtype=bool)
+        if self.regions is not None:
+            mask &= df.Region.isin(self.regions).values
+        if self.years is not None:
+            mask &= df.Year.isin(self.years).values
+        if self.variables is not None:
+            selected = df.Variable.isin(self.variables)
+            prefixes = tuple(var for var in self.variables if var.endswith("|"))
+            if prefixes:
+                selected |= df.Variable.astype(str).str.startswith(prefixes)
+            mask &= selected.values
+        return df[mask]
+
+    def _categorical(self, df):
+        """Store the string columns of `df` as sorted categoricals."""
+        for col in self.schema_columns:
+            cat = df[col].astype("category").cat.remove_unused_categories()
+            df[col] = cat.cat.reorder_categories(sorted(cat.cat.categories))
+        return df
+
     def get_remind_data(self):
         """
-        Read the REMIND csv result file and return an `xarray` with dimensions:
-        * region
-        * variable
-        * year
+        Read the REMIND csv result file and return a long-format
+        `pandas.DataFrame` with the columns
+        * Region
+        * Variable
+        * Unit
+        * Year
+        * value
+
+        `Region`, `Variable` and `Unit` are categorical.
 
-        :return: an multi-dimensional array with Remind data
-        :rtype: xarray.core.dataarray.DataArray
+        :return: a dataframe with Remind data
+        :rtype: pandas.DataFrame
 
         """
+        if self.cache and os.path.exists(self.cache_path):
+            metadata = pq.read_schema(self.cache_path).metadata or {}
+            if metadata.get(b"lca2rmnd") == self._stamp():
+                return self.read_cache()
+        return self.read_mif()
 
-        df = pd.read_csv(
-            self.rmndpath, sep=";", index_col=["Region", "Variable", "Unit"]
-        ).drop(columns=["Model", "Scenario"])
+    def read_cache(self):
+        """
+        Read the selected rows from the Parquet cache.
+
+        :return: a dataframe with Remind data
+        :rtype: pandas.DataFrame
+        """
+        dataset = ds.dataset(self.cache_path, format=ds.ParquetFileFormat(
+            read_options=ds.ParquetReadOptions(
+                dictionary_columns=self.schema_columns)))
+        df = dataset.to_table(filter=self._filter()).to_pandas()
+        return self._categorical(df)
+
+    def _filter(self):
+        """
+        Return the selectors as `pyarrow.dataset` expression,
+        see :meth:`_select`, `None` without selectors.
+        """
+        conditions = []
+        if self.regions is not None:
+            conditions.append(pc.field("Region").isin(self.regions))
+        if self.years is not None:
+            conditions.append(pc.field("Year").isin(self.years))
+        if self.variables is not None:
+            variable = pc.field("Variable")
+            selected = variable.isin(self.variables)
+            for prefix in self.variables:
+                if prefix.endswith("|"):
+                    # no string functions for dictionary columns
+                    selected |= pc.starts_with(
+                        variable.cast(pa.string()), prefix)
+            conditions.append(selected)
+        if not conditions:
+            return None
+        expr = conditions[0]
+        for condition in conditions[1:]:
+            expr &= condition
+        return expr
+
+    def _long_format(self, df):
+        """Turn a chunk of the `.mif` file into the long format."""
+        df = df.set_index(["Region", "Variable", "Unit"])\
+               .drop(columns=["Model", "Scenario"])
         if(len(df.columns == 20)):
             df.drop(columns=df.columns[-1], inplace=True)
         df.columns = df.columns.astype(int)
 
         df.reset_index(inplace=True)
         df = df.melt(id_vars=["Region", "Variable", "Unit"], var_name = "Year")
-
+        df["Year"] = df["Year"].astype(int)
+        df["value"] = df["value"].astype(float)
         return df
 
+    def read_mif(self):
+        """
+        Parse the REMIND csv result file into the long format
+        described in :meth:`get_remind_data`, one chunk at a time.
+        If caching is enabled, all rows are also written to the cache.
+
+        :return: a dataframe with Remind data
+        :rtype: pandas.DataFrame
+        """
+        writer = None
+        tmp_path = self.cache_path.with_name(self.cache_path.name + ".tmp")
+        if self.cache:
+            schema = pa.schema(
+                [(col, pa.string()) for col in self.schema_columns]
+                + [("Year", pa.int64()), ("value", pa.float64())],
+                metadata={"lca2rmnd": self._stamp()})
+            try:
+                writer = pq.ParquetWriter(tmp_path, schema)
+            except OSError:
+                writer = None
+
+        parts = []
+        for chunk in pd.read_csv(self.rmndpath, sep=";",
+                                 chunksize=self.chunksize):
+            df = self._long_format(chunk)
+            if writer is not None:
+                writer.write_table(pa.Table.from_pandas(
+                    df, schema=schema, preserve_index=False))
+            parts.append(self._select(df))
+
+        if writer is not None:
+            writer.close()
+            os.replace(tmp_path, self.cache_path)
 
+        return self._categorical(pd.concat(parts, ignore_index=True))
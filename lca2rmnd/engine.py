@@ -0,0 +1,608 @@
+import brightway2 as bw
+from bw2data.backends.peewee.schema import ActivityDataset as Act
+
+from .profiling import NullProfiler
+import numpy as np
+import os
+from scipy import sparse
+from scipy.sparse.linalg import LinearOperator, bicgstab, spilu, splu
+
+
+class MethodStack():
+    """
+    Characterization factors of several LCIA methods, stacked into
+    a single sparse matrix with one row per method and one column
+    per biosphere flow.
+
+    The scores for all methods are then the product of this matrix
+    with a biosphere inventory vector. The matrix is built once for
+    every distinct biosphere index it is used with, so a stack can be
+    shared among the engines of different year databases.
+
+    :ivar methods: list of brightway2 method tuples.
+    :vartype methods: list
+    """
+    def __init__(self, methods):
+        self.methods = list(methods)
+        self._matrices = {}
+
+    def __len__(self):
+        return len(self.methods)
+
+    def __iter__(self):
+        return iter(self.methods)
+
+    def matrix(self, lca):
+        """
+        Return the characterization matrix for the biosphere index
+        of `lca`.
+
+        :param lca: a brightway2 LCA object with loaded LCI data.
+        :type lca: bw2calc.LCA
+        :return: a (methods x biosphere flows) matrix
+        :rtype: scipy.sparse.csr_matrix
+        """
+        index = frozenset(lca.biosphere_dict.items())
+        if index not in self._matrices:
+            rows = []
+            for method in self.methods:
+                lca.switch_method(method)
+                rows.append(lca.characterization_matrix.diagonal())
+            self._matrices[index] = sparse.csr_matrix(
+                np.vstack(rows) if rows
+                else np.zeros((0, len(lca.biosphere_dict))))
+        return self._matrices[index]
+
+
+def _match(current, previous):
+    """
+    Return the position of each entry of `current` in `previous`,
+    -1 if it is missing or not unique in `previous`.
+    """
+    position = {}
+    for idx, ident in enumerate(previous):
+        position[ident] = -1 if ident in position else idx
+    return np.array([position.get(ident, -1) for ident in current], dtype=int)
+
+
+def _permutation(match):
+    """
+    Return `match` if it is a permutation, `None` otherwise.
+    """
+    if (match < 0).any() or len(np.unique(match)) != len(match):
+        return None
+    return match
+
+
+def top(matrix, n):
+    """
+    Select the `n` entries with the largest absolute values along the
+    last axis of `matrix`, using a partial sort.
+
+    :param matrix: a dense array.
+    :type matrix: numpy.ndarray
+    :param n: number of entries to select.
+    :type n: int
+    :return: indices and values of the selected entries, in descending
+        order of absolute value.
+    :rtype: tuple
+    """
+    matrix = np.asarray(matrix)
+    n = min(n, matrix.shape[-1])
+    if n < matrix.shape[-1]:
+        idx = np.argpartition(-np.abs(matrix), n - 1, axis=-1)[..., :n]
+    else:
+        idx = np.broadcast_to(np.arange(n), matrix.shape)
+    values = np.take_along_axis(matrix, idx, axis=-1)
+    order = np.argsort(-np.abs(values), axis=-1, kind="stable")
+    return (np.take_along_axis(idx, order, axis=-1),
+            np.take_along_axis(values, order, axis=-1))
+
+
+def _preconditioner(solver, rows, cols):
+    """
+    Return the factorization held by `solver` with the rows and columns
+    of a new matrix matched to the matrix it belongs to, given the
+    match `rows` and `cols` to the matrix of `solver`.
+
+    :param solver: a direct or iterative solver.
+    :type solver: Union[scipy.sparse.linalg.SuperLU, IterativeSolver]
+    :return: the factorization and the composed row and column order,
+        `None` where the order is the same.
+    :rtype: tuple
+    """
+    lu = getattr(solver, "lu", solver)
+    # the factorization of an iterative solver may belong
+    # to the matrix of an earlier year
+    if getattr(solver, "rows", None) is not None:
+        rows = solver.rows[rows]
+    if getattr(solver, "cols", None) is not None:
+        cols = solver.cols[cols]
+    identity = np.arange(len(rows))
+    return (lu, None if (rows == identity).all() else rows,
+            None if (cols == identity).all() else cols)
+
+
+class IterativeSolver():
+    """
+    Solve systems of a technosphere matrix with BiCGSTAB, preconditioned
+    with the LU factorization of a similar matrix, e.g., the technosphere
+    matrix of the previous year.
+
+    Row `i` of `matrix` corresponds to row `rows[i]` of the factorized
+    matrix, and column `j` to column `cols[j]`. `None` means that the
+    order is the same. If the iteration does not reach the relative
+    tolerance `tol` within `maxiter` steps, `matrix` itself is factorized
+    and this and all later systems are solved directly.
+
+    :ivar lu: the preconditioner, or the factorization of `matrix`
+        after a fallback.
+    :vartype lu: scipy.sparse.linalg.SuperLU
+    :ivar fallback: whether `matrix` had to be factorized.
+    :vartype fallback: bool
+    """
+    def __init__(self, matrix, lu, rows=None, cols=None,
+                 tol=1e-8, maxiter=100):
+        self.matrix = matrix.tocsr()
+        self.lu = lu
+        self.rows = rows
+        self.cols = cols
+        self.tol = tol
+        self.maxiter = maxiter
+        self.fallback = False
+        self.operator = LinearOperator(
+            self.matrix.shape, matvec=self._precondition, dtype=float)
+
+    def _precondition(self, vector):
+        vector = np.ravel(vector)
+        if self.rows is None:
+            permuted = vector
+        else:
+            permuted = np.empty_like(vector)
+            permuted[self.rows] = vector
+        result = self.lu.solve(permuted)
+        return result if self.cols is None else result[self.cols]
+
+    def factorize(self):
+        """
+        Factorize the matrix and solve directly from now on.
+        """
+        self.lu = splu(self.matrix.tocsc())
+        self.rows = self.cols = None
+        self.fallback = True
+
+    def solve(self, rhs, x0=None):
+        """
+        Solve the system for the right-hand side `rhs`.
+
+        :param rhs: a vector, or a matrix with one system per column.
+        :type rhs: numpy.ndarray
+        :param x0: initial guess with the shape of `rhs`.
+        :type x0: numpy.ndarray
+        :return: the solution with the shape of `rhs`
+        :rtype: numpy.ndarray
+        """
+        if rhs.ndim == 2:
+            result = np.zeros(rhs.shape)
+            for col in range(rhs.shape[1]):
+                result[:, col] = self.solve(
+                    rhs[:, col], None if x0 is None else x0[:, col])
+            return result
+        if self.fallback:
+            return self.lu.solve(rhs)
+        x, info = bicgstab(self.matrix, rhs, x0=x0, rtol=self.tol, atol=0.,
+                           maxiter=self.maxiter, M=self.operator)
+        if info != 0:
+            self.factorize()
+            return self.lu.solve(rhs)
+        return x
+
+
+class LCAEngine():
+    """
+    Solve many demand vectors against a single brightway2 database.
+
+    The technosphere and biosphere matrices are loaded and the
+    technosphere is factorized on the first call to :meth:`lci`.
+    Later calls only build a demand array and solve against the
+    existing factorization. All demands passed to one engine
+    have to be part of the same (year) database, or of the
+    databases it depends on.
+
+    By default, all LCIA methods are evaluated at once using a
+    :class:`MethodStack`. Set `stacked` to `False` to switch methods one
+    by one on the underlying LCA object instead.
+
+    If a :class:`~lca2rmnd.cache.ScoreCache` is given, scores are looked up
+    there first; the matrices are only loaded once a score is missing.
+
+    Several demands can be solved at once with :meth:`lci_many`,
+    :meth:`biosphere_many` and :meth:`scores_many`, in blocks of at most
+    `chunksize` right-hand sides.
+
+    With `mode` set to "iterative", the technosphere matrix is not
+    factorized if the engine of the `previous` year database is given.
+    The systems are solved iteratively instead, see
+    :class:`IterativeSolver`, with the factorization of the previous
+    engine as preconditioner and its supply arrays as initial guesses.
+    Rows and columns of the two databases are matched by activity name,
+    reference product and location; if they do not match one to one, an
+    incomplete factorization is used as preconditioner. Supply arrays are
+    kept for all demands passed with a `label`, e.g., the region, so
+    that the next engine can start from them. The first engine of a
+    chain solves directly.
+
+    If a :class:`~lca2rmnd.profiling.Profiler` is given, loading,
+    factorization, solving and characterization are timed as the phases
+    "load", "factorize", "solve" and "lcia", and the bytes of matrix
+    data loaded and the number of inventories ("lci") and scores
+    ("lcia") calculated are counted.
+
+    :ivar lca: the brightway2 LCA object holding the matrices and
+        index dictionaries, `None` before the first calculation.
+    :vartype lca: bw2calc.LCA
+    """
+    def __init__(self, stacked=True, cache=None, chunksize=256,
+                 mode="direct", previous=None, tol=1e-8, maxiter=100,
+                 profiler=None):
+        if mode not in ("direct", "iterative"):
+            raise ValueError("Unknown solver mode: {}".format(mode))
+        self.stacked = stacked
+        self.cache = cache
+        self.chunksize = chunksize
+        self.mode = mode
+        self.previous = previous if mode == "iterative" else None
+        self.tol = tol
+        self.maxiter = maxiter
+        self.profiler = profiler or NullProfiler()
+        self.lca = None
+        self.solver = None
+        # supply arrays of labelled demands
+        self.supplies = {}
+        self._stacks = {}
+        self._warm = None
+        self._identities = {}
+
+    def _keys(self, demand):
+        """Replace activity proxies in `demand` by their keys."""
+        return {getattr(act, "key", act): amount
+                for act, amount in demand.items()}
+
+    def load(self, demand):
+        """
+        Load the matrices for the databases required by `demand`
+        and factorize the technosphere matrix.
+
+        :param demand: a brightway2 demand dictionary.
+        :type demand: dict
+        """
+        with self.profiler.phase("load"):
+            self.lca = bw.LCA(self._keys(demand))
+            self.lca.load_lci_data()
+            if self.profiler.enabled:
+                self.profiler.count("bytes", sum(
+                    os.path.getsize(fp) for fp in self.lca.database_filepath))
+        matrix = self.lca.technosphere_matrix
+        previous, self.previous = self.previous, None
+        if previous is None or previous.lca is None:
+            with self.profiler.phase("factorize"):
+                self.solver = splu(matrix.tocsc())
+            return
+
+        rows = _match(self.identities("product"),
+                      previous.identities("product"))
+        cols = _match(self.identities("activity"),
+                      previous.identities("activity"))
+        self._warm = (cols, previous.supplies)
+        if _permutation(rows) is None or _permutation(cols) is None \
+           or len(rows) != len(previous.lca.product_dict):
+            with self.profiler.phase("factorize"):
+                lu, rows, cols = spilu(matrix.tocsc()), None, None
+        else:
+            lu, rows, cols = _preconditioner(previous.solver, rows, cols)
+        self.solver = IterativeSolver(
+            matrix, lu, rows, cols, tol=self.tol, maxiter=self.maxiter)
+
+    def identities(self, kind="activity"):
+        """
+        Return name, reference product and location of the activity
+        of each technosphere column (or row, for `kind` "product"),
+        in matrix order. Activities which are not found are identified
+        by their key.
+
+        :param kind: "activity" for columns or "product" for rows.
+        :type kind: str
+        :rtype: list
+        """
+        if kind not in self._identities:
+            index = getattr(self.lca, kind + "_dict")
+            keys = sorted(index, key=index.get)
+            if "_lookup" not in self._identities:
+                lookup = {}
+                for db in {key[0] for key in keys}:
+                    query = Act.select(
+                        Act.code, Act.name, Act.product, Act.location)\
+                        .where(Act.database == db).tuples()
+                    for code, name, product, location in query:
+                        lookup[(db, code)] = (name, product, location)
+                self._identities["_lookup"] = lookup
+            lookup = self._identities["_lookup"]
+            self._identities[kind] = [lookup.get(key, key) for key in keys]
+        return self._identities[kind]
+
+    def _initial_guess(self, shape, labels):
+        """
+        Return the supply arrays of the previous engine for `labels`,
+        in the column order of this engine.
+        """
+        if self._warm is None or labels is None:
+            return None
+        cols, supplies = self._warm
+        x0 = np.zeros(shape)
+        for col, label in enumerate(labels):
+            if label in supplies:
+                x0[:, col] = np.where(cols >= 0, supplies[label][cols], 0.)
+        return x0
+
+    def _solve(self, rhs, labels=None):
+        """
+        Solve the (products x demands) matrix `rhs` and keep the supply
+        arrays of labelled demands in iterative mode.
+        """
+        self.profiler.count("lci", rhs.shape[1])
+        with self.profiler.phase("solve"):
+            if isinstance(self.solver, IterativeSolver):
+                supply = self.solver.solve(
+                    rhs, self._initial_guess(rhs.shape, labels))
+            else:
+                supply = self.solver.solve(rhs)
+        if self.mode == "iterative" and labels is not None:
+            for col, label in enumerate(labels):
+                self.supplies[label] = supply[:, col]
+        return supply
+
+    def demand_array(self, demand):
+        """
+        Turn a demand dictionary into an array in the technosphere
+        row order of the loaded matrices.
+
+        :param demand: a brightway2 demand dictionary.
+        :type demand: dict
+        :return: the demand array
+        :rtype: numpy.ndarray
+        """
+        if self.lca is None:
+            self.load(demand)
+        array = np.zeros(len(self.lca.product_dict))
+        for key, amount in self._keys(demand).items():
+            array[self.lca.product_dict[key]] += amount
+        return array
+
+    def demand_matrix(self, demands):
+        """
+        Turn a list of demand dictionaries into a matrix with one
+        column per demand, in the technosphere row order of the
+        loaded matrices.
+
+        :param demands: a list of brightway2 demand dictionaries.
+        :type demands: list
+        :return: the (products x demands) demand matrix
+        :rtype: scipy.sparse.csc_matrix
+        """
+        if self.lca is None:
+            self.load(demands[0])
+        rows, cols, values = [], [], []
+        for col, demand in enumerate(demands):
+            for key, amount in self._keys(demand).items():
+                rows.append(self.lca.product_dict[key])
+                cols.append(col)
+                values.append(amount)
+        # duplicate entries are summed up
+        return sparse.csc_matrix(
+            (values, (rows, cols)),
+            shape=(len(self.lca.product_dict), len(demands)))
+
+    def lci(self, demand, label=None):
+        """
+        Calculate the supply array for `demand`.
+
+        :param demand: a brightway2 demand dictionary.
+        :type demand: dict
+        :param label: label of the demand, see :class:`LCAEngine`.
+        :return: the supply array
+        :rtype: numpy.ndarray
+        """
+        array = self.demand_array(demand)
+        return self._solve(
+            array[:, None], None if label is None else [label])[:, 0]
+
+    def lci_many(self, demands, labels=None):
+        """
+        Calculate the supply arrays for several demands
+        with a single call to the solver.
+
+        :param demands: a list of brightway2 demand dictionaries.
+        :type demands: list
+        :param labels: labels of the demands, see :class:`LCAEngine`.
+        :type labels: list
+        :return: the (products x demands) supply matrix
+        :rtype: numpy.ndarray
+        """
+        rhs = self.demand_matrix(demands)
+        return self._solve(rhs.toarray(), labels)
+
+    def biosphere(self, demand, label=None):
+        """
+        Calculate the aggregated life cycle inventory for `demand`,
+        i.e., the sum of all biosphere flows over the supply chain.
+        Rows follow `self.lca.biosphere_dict`.
+
+        :param demand: a brightway2 demand dictionary.
+        :type demand: dict
+        :param label: label of the demand, see :class:`LCAEngine`.
+        :return: the biosphere inventory vector
+        :rtype: numpy.ndarray
+        """
+        supply = self.lci(demand, label)
+        return self.lca.biosphere_matrix @ supply
+
+    def biosphere_many(self, demands, labels=None):
+        """
+        Calculate the aggregated life cycle inventories for several
+        demands. The demands are solved in blocks of `chunksize`
+        columns to bound the size of the dense supply matrix.
+
+        :param demands: a list of brightway2 demand dictionaries.
+        :type demands: list
+        :param labels: labels of the demands, see :class:`LCAEngine`.
+        :type labels: list
+        :return: the (biosphere flows x demands) inventory matrix
+        :rtype: numpy.ndarray
+        """
+        parts = []
+        for start in range(0, len(demands), self.chunksize):
+            supply = self.lci_many(
+                demands[start:start + self.chunksize],
+                None if labels is None
+                else labels[start:start + self.chunksize])
+            parts.append(self.lca.biosphere_matrix @ supply)
+        return np.hstack(parts)
+
+    def scores(self, demand, methods, label=None):
+        """
+        Calculate the LCA scores of `demand` for each of the `methods`.
+
+        :param demand: a brightway2 demand dictionary.
+        :type demand: dict
+        :param methods: list of brightway2 method tuples or a method stack.
+        :type methods: Union[list, MethodStack]
+        :param label: label of the demand, see :class:`LCAEngine`.
+        :return: one score per method, in the order of `methods`
+        :rtype: numpy.ndarray
+        """
+        return self.scores_many(
+            [demand], methods, None if label is None else [label])[0]
+
+    def scores_many(self, demands, methods, labels=None):
+        """
+        Calculate the LCA scores of several demands for each of the
+        `methods`. All demands missing from the cache are solved
+        together, see :meth:`biosphere_many`.
+
+        :param demands: a list of brightway2 demand dictionaries.
+        :type demands: list
+        :param methods: list of brightway2 method tuples or a method stack.
+        :type methods: Union[list, MethodStack]
+        :param labels: labels of the demands, see :class:`LCAEngine`.
+        :type labels: list
+        :return: a (demands x methods) array of scores
+        :rtype: numpy.ndarray
+        """
+        result = np.zeros((len(demands), len(methods)))
+        missing = list(range(len(demands)))
+        if self.cache is not None:
+            keys = [self.cache.keys(demand, methods) for demand in demands]
+            missing = []
+            for idx, key in enumerate(keys):
+                cached = self.cache.get(key)
+                if None in cached:
+                    missing.append(idx)
+                else:
+                    result[idx] = cached
+        if not missing:
+            return result
+
+        inventory = self.biosphere_many(
+            [demands[idx] for idx in missing],
+            None if labels is None else [labels[idx] for idx in missing])
+        self.profiler.count("lcia", len(missing) * len(methods))
+        with self.profiler.phase("lcia"):
+            if self.stacked:
+                result[missing] = (
+                    self.stack(methods).matrix(self.lca) @ inventory).T
+            else:
+                for col, method in enumerate(methods):
+                    self.lca.switch_method(method)
+                    result[missing, col] = \
+                        self.lca.characterization_matrix.diagonal() \
+                        @ inventory
+
+        if self.cache is not None:
+            for idx in missing:
+                self.cache.set(keys[idx], result[idx],
+                               self.cache.database(demands[idx]))
+        return result
+
+    def contributions(self, demands, methods, n=10, labels=None):
+        """
+        Find the processes and biosphere flows contributing most to the
+        scores of several demands. All demands are solved at once, and
+        the contributions of all methods are calculated from the stacked
+        characterization matrix `C`: process contributions are
+        `(C B) * supply`, flow contributions `C * (B supply)`.
+
+        :param demands: a list of brightway2 demand dictionaries.
+        :type demands: list
+        :param methods: list of brightway2 method tuples or a method stack.
+        :type methods: Union[list, MethodStack]
+        :param n: number of processes and flows to return.
+        :type n: int
+        :param labels: labels of the demands, see :class:`LCAEngine`.
+        :type labels: list
+        :return: two tuples `(indices, values)` for processes and flows,
+            see :func:`top`. The arrays have the shape (demands x methods
+            x n). Indices refer to :meth:`activity_keys` and
+            :meth:`flow_keys`, respectively.
+        :rtype: tuple
+        """
+        supply = self.lci_many(demands, labels)
+        cf = self.stack(methods).matrix(self.lca)
+        cf_bio = (cf @ self.lca.biosphere_matrix).toarray()
+        cf = cf.toarray()
+        inventory = self.lca.biosphere_matrix @ supply
+
+        processes = ([], [])
+        flows = ([], [])
+        for col in range(len(demands)):
+            for part, result in zip(
+                    top(cf_bio * supply[:, col], n), processes):
+                result.append(part)
+            for part, result in zip(
+                    top(cf * inventory[:, col], n), flows):
+                result.append(part)
+        return (tuple(np.array(part) for part in processes),
+                tuple(np.array(part) for part in flows))
+
+    def activity_keys(self):
+        """
+        Return the activity keys of the technosphere columns.
+
+        :rtype: list
+        """
+        index = self.lca.activity_dict
+        return sorted(index, key=index.get)
+
+    def flow_keys(self):
+        """
+        Return the keys of the biosphere flows, in row order.
+
+        :rtype: list
+        """
+        index = self.lca.biosphere_dict
+        return sorted(index, key=index.get)
+
+    def stack(self, methods):
+        """
+        Return a :class:`MethodStack` for `methods`. Lists of methods
+        are converted once per engine.
+
+        :param methods: list of brightway2 method tuples or a method stack.
+        :type methods: Union[list, MethodStack]
+        :rtype: MethodStack
+        """
+        if isinstance(methods, MethodStack):
+            return methods
+        methods = tuple(methods)
+        if methods not in self._stacks:
+            self._stacks[methods] = MethodStack(methods)
+        return self._stacks[methods]
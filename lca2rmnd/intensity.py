@@ -0,0 +1,102 @@
+import numpy as np
+
+
+class IntensityStore():
+    """
+    Unit results of single activities, i.e., LCA scores and biosphere
+    flows per unit of output, stored per database.
+
+    LCA results are linear in the demand, so the result for any demand
+    is the sum of the unit results of its activities, weighted by the
+    demanded amounts. Unit results are calculated once per database
+    and set of methods (or flows) and kept in memory. If a
+    :class:`~lca2rmnd.cache.ScoreCache` is given, they are also stored
+    there, so that later sessions, e.g., for a changed REMIND output
+    file, do not need any new calculations.
+
+    :ivar cache: persistent cache for the unit results.
+    :vartype cache: lca2rmnd.cache.ScoreCache
+    :ivar tables: unit results, keyed by kind, database name and
+        methods (or flows), then by activity key.
+    :vartype tables: dict
+    """
+    def __init__(self, cache=None):
+        self.cache = cache
+        self.tables = {}
+
+    def scores(self, db, keys, methods, engine):
+        """
+        Return the unit scores of the activities with `keys`.
+
+        :param db: name of the brightway2 database.
+        :type db: str
+        :param keys: activity keys.
+        :type keys: list
+        :param methods: list of brightway2 method tuples or a method stack.
+        :type methods: Union[list, lca2rmnd.engine.MethodStack]
+        :param engine: engine for the calculation of missing results.
+        :type engine: lca2rmnd.engine.LCAEngine
+        :return: a (keys x methods) array
+        :rtype: numpy.ndarray
+        """
+        return self._results("scores", db, keys, methods, engine)
+
+    def flows(self, db, keys, flows, engine):
+        """
+        Return the aggregated biosphere flows per unit of output
+        of the activities with `keys`.
+
+        :param db: name of the brightway2 database.
+        :type db: str
+        :param keys: activity keys.
+        :type keys: list
+        :param flows: biosphere flow keys.
+        :type flows: list
+        :param engine: engine for the calculation of missing results.
+        :type engine: lca2rmnd.engine.LCAEngine
+        :return: a (keys x flows) array
+        :rtype: numpy.ndarray
+        """
+        return self._results("flows", db, keys, flows, engine)
+
+    def _cache_keys(self, kind, key, columns):
+        """Cache keys of the unit results of the activity `key`."""
+        if kind == "scores":
+            return self.cache.keys({key: 1}, columns)
+        return self.cache.flow_keys({key: 1}, columns)
+
+    def _results(self, kind, db, keys, columns, engine):
+        """
+        Look up the unit results of `keys`, calculating the missing
+        ones with a single call to the engine.
+        """
+        table = self.tables.setdefault((kind, db, tuple(columns)), {})
+        missing = [key for key in dict.fromkeys(keys) if key not in table]
+
+        if missing and self.cache is not None:
+            for key in missing:
+                cached = self.cache.get(self._cache_keys(kind, key, columns))
+                if None not in cached:
+                    table[key] = np.array(cached)
+            missing = [key for key in missing if key not in table]
+
+        if missing:
+            inventory = engine.biosphere_many(
+                [{key: 1} for key in missing], missing)
+            if kind == "scores":
+                engine.profiler.count("lcia", len(missing) * len(columns))
+                with engine.profiler.phase("lcia"):
+                    values = (engine.stack(columns).matrix(engine.lca)
+                              @ inventory).T
+            else:
+                rows = [engine.lca.biosphere_dict[flow] for flow in columns]
+                values = inventory[rows].T
+            for key, row in zip(missing, values):
+                table[key] = row
+                if self.cache is not None:
+                    self.cache.set(
+                        self._cache_keys(kind, key, columns), row,
+                        self.cache.database({key: 1}))
+
+        return np.array([table[key] for key in keys]).reshape(
+            len(keys), len(columns))
@@ -0,0 +1,234 @@
+import brightway2 as bw
+from bw2calc.matrices import TechnosphereBiosphereMatrixBuilder as TBMBuilder
+from stats_arrays import MCRandomNumberGenerator
+
+from .engine import MethodStack
+
+from pathlib import Path
+import json
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import splu
+
+
+class RunningStats():
+    """
+    Mean, standard deviation, minimum and maximum of samples
+    which are added in batches, without keeping the samples.
+
+    Batches are combined with the parallel variant of Welford's
+    algorithm, so statistics of different workers can be merged.
+
+    :ivar count: number of samples.
+    :vartype count: int
+    :ivar mean: mean of the samples.
+    :vartype mean: numpy.ndarray
+    :ivar min: minimum of the samples.
+    :vartype min: numpy.ndarray
+    :ivar max: maximum of the samples.
+    :vartype max: numpy.ndarray
+    """
+    def __init__(self, shape):
+        self.count = 0
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+        self.min = np.full(shape, np.inf)
+        self.max = np.full(shape, -np.inf)
+
+    def _combine(self, count, mean, m2):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean = self.mean + delta * count / total
+        self.m2 = self.m2 + m2 + delta ** 2 * self.count * count / total
+        self.count = total
+
+    def update(self, samples):
+        """
+        Add a batch of samples.
+
+        :param samples: array with the samples along the first axis.
+        :type samples: numpy.ndarray
+        """
+        if len(samples) == 0:
+            return
+        mean = samples.mean(axis=0)
+        self._combine(len(samples), mean,
+                      ((samples - mean) ** 2).sum(axis=0))
+        self.min = np.minimum(self.min, samples.min(axis=0))
+        self.max = np.maximum(self.max, samples.max(axis=0))
+
+    def merge(self, other):
+        """
+        Add the samples summarized by another :class:`RunningStats` object.
+        """
+        if other.count == 0:
+            return
+        self._combine(other.count, other.mean, other.m2)
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+
+    @property
+    def std(self):
+        """Sample standard deviation."""
+        return np.sqrt(self.m2 / max(self.count - 1, 1))
+
+
+class MatrixSampler():
+    """
+    Draw samples of a technosphere or biosphere matrix.
+
+    The sparsity pattern is computed once from the parameter array.
+    For every sample, only the values are drawn and summed up per
+    matrix entry; the matrix itself is reused.
+
+    :ivar matrix: the matrix holding the last sample.
+    :vartype matrix: scipy.sparse.csc_matrix
+    """
+    def __init__(self, params, shape, technosphere=False, seed=None):
+        self.rng = MCRandomNumberGenerator(params, seed=seed)
+        self.sign = np.ones(len(params))
+        if technosphere:
+            # inputs are consumed, see `TBMBuilder.fix_supply_use`
+            self.sign = TBMBuilder.fix_supply_use(params, self.sign)
+        linear = params["col"].astype(np.int64) * shape[0] + params["row"]
+        unique, self.inverse = np.unique(linear, return_inverse=True)
+        # the data of the matrix holds the position of each entry
+        # in `unique`, in the storage order of the matrix
+        self.matrix = sparse.csc_matrix(
+            (np.arange(1, len(unique) + 1, dtype=float),
+             (unique % shape[0], unique // shape[0])), shape=shape)
+        self.order = self.matrix.data.astype(np.int64) - 1
+
+    def sample(self):
+        """
+        Draw a new sample.
+
+        :rtype: scipy.sparse.csc_matrix
+        """
+        values = np.bincount(self.inverse, weights=self.rng.next() * self.sign,
+                             minlength=len(self.order))
+        self.matrix.data = values[self.order]
+        return self.matrix
+
+
+class MonteCarloScores():
+    """
+    Monte Carlo simulation of the scores of many demands
+    in a single (year) database.
+
+    Each iteration samples the technosphere and biosphere matrices,
+    factorizes the technosphere once and solves all demands together.
+    Characterization factors are not sampled. The scores, multiplied
+    by `scale`, are written to `directory` in chunks of `chunksize`
+    iterations, as `.npy` files with the shape
+    (iterations x demands x methods). The labels of the demands are
+    written by :meth:`prepare`, which has to be called once before the
+    runs of a simulation.
+
+    :ivar demands: brightway2 demand dictionaries, keyed by activity keys.
+    :vartype demands: list
+    :ivar labels: a label for each demand.
+    :vartype labels: list
+    :ivar methods: list of brightway2 method tuples.
+    :vartype methods: list
+    :ivar directory: output directory for the samples.
+    :vartype directory: pathlib.Path
+    :ivar scale: factor for all scores, e.g., the occupancy factor
+        of :meth:`lca2rmnd.reporting.TransportLCAReporting._occupancy_factor`.
+    :vartype scale: float
+    """
+    def __init__(self, demands, labels, methods, directory, chunksize=10,
+                 scale=1.):
+        self.demands = [{getattr(act, "key", act): amount
+                         for act, amount in demand.items()}
+                        for demand in demands]
+        self.labels = list(labels)
+        self.methods = list(methods)
+        self.directory = Path(directory)
+        self.chunksize = chunksize
+        self.scale = scale
+
+    def prepare(self, name):
+        """
+        Remove the files of an earlier simulation `name` and write
+        the labels of the demands and the methods.
+
+        :param name: prefix of the sample files.
+        :type name: str
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for path in self.directory.glob("{}_*".format(name)):
+            path.unlink()
+        with open(self.directory / "{}_labels.json".format(name), "w") as f:
+            json.dump({"labels": self.labels, "methods": self.methods,
+                       "scale": self.scale}, f)
+
+    def run(self, iterations, seed, name, offset=0):
+        """
+        Run `iterations` iterations and write the scores to the files
+        `<name>_<iteration>.npy`, numbered from `offset`.
+
+        :param iterations: number of iterations.
+        :type iterations: int
+        :param seed: seed of the random number generators, an integer
+            or a list of integers, see `numpy.random.SeedSequence`.
+        :type seed: Union[int, list]
+        :param name: prefix of the sample files.
+        :type name: str
+        :param offset: number of the first iteration, for runs
+            that are split among several workers.
+        :type offset: int
+        :return: statistics of the (scaled) scores.
+        :rtype: RunningStats
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        lca = bw.LCA(self.demands[0])
+        lca.load_lci_data()
+        cf = MethodStack(self.methods).matrix(lca)
+        rhs = np.zeros((len(lca.product_dict), len(self.demands)))
+        for col, demand in enumerate(self.demands):
+            for key, amount in demand.items():
+                rhs[lca.product_dict[key], col] += amount
+
+        tech_seed, bio_seed = np.random.SeedSequence(seed).generate_state(2)
+        technosphere = MatrixSampler(
+            lca.tech_params, lca.technosphere_matrix.shape,
+            technosphere=True, seed=int(tech_seed))
+        biosphere = MatrixSampler(
+            lca.bio_params, lca.biosphere_matrix.shape, seed=int(bio_seed))
+
+        stats = RunningStats((len(self.demands), len(self.methods)))
+        for start in range(0, iterations, self.chunksize):
+            chunk = np.zeros((min(self.chunksize, iterations - start),
+                              len(self.demands), len(self.methods)))
+            for idx in range(len(chunk)):
+                supply = splu(technosphere.sample()).solve(rhs)
+                chunk[idx] = (cf @ (biosphere.sample() @ supply)).T \
+                    * self.scale
+            np.save(self.directory
+                    / "{}_{:06d}.npy".format(name, offset + start), chunk)
+            stats.update(chunk)
+        return stats
+
+
+def read_samples(directory, name):
+    """
+    Read the samples written by :meth:`MonteCarloScores.run`.
+
+    :param directory: output directory of the samples.
+    :type directory: str
+    :param name: prefix of the sample files.
+    :type name: str
+    :return: the labels of the demands, the methods and the
+        (iterations x demands x methods) array of scores, including
+        the `scale` of the simulation.
+    :rtype: tuple
+    """
+    directory = Path(directory)
+    with open(directory / "{}_labels.json".format(name)) as f:
+        meta = json.load(f)
+    chunks = [np.load(path) for path
+              in sorted(directory.glob("{}_[0-9]*.npy".format(name)))]
+    return ([tuple(label) for label in meta["labels"]],
+            [tuple(method) for method in meta["methods"]],
+            np.concatenate(chunks))
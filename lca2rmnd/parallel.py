@@ -0,0 +1,77 @@
+import brightway2 as bw
+
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+
+def run_unit(unit):
+    """
+    Run a single unit of work.
+
+    :param unit: tuple `(project, obj, name, args)`. The method `name` of
+        `obj` is called with `args` after activating the brightway2 `project`.
+    :type unit: tuple
+    :return: the return value of the method
+    """
+    project, obj, name, args = unit
+    if bw.projects.current != project:
+        bw.projects.set_current(project)
+    return getattr(obj, name)(*args)
+
+
+def process_pool(jobs):
+    """
+    Create a pool of `jobs` worker processes.
+
+    Workers are started with the *spawn* method, so that every worker opens
+    its own connection to the brightway2 project.
+
+    :param jobs: number of worker processes.
+    :type jobs: int
+    :rtype: concurrent.futures.ProcessPoolExecutor
+    """
+    return ProcessPoolExecutor(
+        max_workers=jobs,
+        mp_context=multiprocessing.get_context("spawn"))
+
+
+def run_units(units, jobs=1, pool=None):
+    """
+    Run units of work, see :func:`iter_units`.
+
+    :return: the results in the order of `units`
+    :rtype: list
+    """
+    return list(iter_units(units, jobs, pool))
+
+
+def iter_units(units, jobs=1, pool=None):
+    """
+    Run units of work, either in the current process or,
+    for `jobs` > 1, in a pool of worker processes. The results
+    are yielded one at a time, as soon as they are available.
+
+    The objects passed with the units have to be picklable
+    to be run in a pool.
+
+    :param units: list of `(project, obj, name, args)` tuples,
+        see :func:`run_unit`.
+    :type units: list
+    :param jobs: number of worker processes.
+    :type jobs: int
+    :param pool: an existing pool to submit the units to, e.g., to
+        schedule the units of several callers together. `jobs` is
+        ignored if a pool is given.
+    :type pool: concurrent.futures.Executor
+    :return: the results in the order of `units`
+    :rtype: generator
+    """
+    units = list(units)
+    if pool is not None:
+        yield from pool.map(run_unit, units)
+    elif jobs is None or jobs <= 1 or len(units) <= 1:
+        for unit in units:
+            yield run_unit(unit)
+    else:
+        with process_pool(min(jobs, len(units))) as pool:
+            yield from pool.map(run_unit, units)
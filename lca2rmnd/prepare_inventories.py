@@ -12,6 +12,10 @@ Usage example:
     create_project(project_name, fpei36, years, scenario, "data/remind/")
     load_and_merge(scenario, years)
 
+    # several scenarios, four databases at a time
+    create_project(project_name, fpei36, years, ["BAU", "SCP26"],
+                   "data/remind/", jobs=4)
+
     # test
     act = bw.Database("ecoinvent_BAU_2015").random()
     bw.LCA({act: 1}, bw.methods.random()).lci()
@@ -21,19 +25,51 @@ Usage example:
 import premise
 from bw2data.utils import merge_databases
 
+from .cache import ScoreCache
+from .parallel import process_pool
+
+import carculator
 from carculator import CarInputParameters, \
     fill_xarray_from_input_parameters, \
     CarModel, InventoryCalculation
 
-from bw2data.backends.peewee.proxies import Activity, ActivityDataset as Act
+from bw2data import geomapping, mapping
+from bw2data.backends.peewee import sqlite3_lci_db
+from bw2data.backends.peewee.proxies import ActivityDataset as Act
+from bw2data.backends.peewee.schema import ExchangeDataset as Exc
+from bw2data.backends.peewee.utils import dict_as_activitydataset, \
+    dict_as_exchangedataset
+from bw2data.search import IndexManager
+from peewee import chunked
 import brightway2 as bw
 import numpy as np
 
+from concurrent.futures import as_completed
+from contextlib import nullcontext
+from pathlib import Path
+import copy
+import hashlib
+import json
+import multiprocessing
+import os
+import pickle
+import re
+import time
+import uuid
+
 fpei36 = "/home/alois/ecoinvent/ecoinvent 3.6_cut-off_ecoSpold02/datasets/"
 model = "remind"
 
+source_db = 'ecoinvent 3.6 cutoff'
+
+# parameters of the carculator calculation, see `load_car_activities`
+cycle = "WLTC"
+ecoinvent_compatibility = False
+
+
 def create_project(project_name, ecoinvent_path,
-                   years, scenario, remind_data_path, from_scratch=True):
+                   years, scenario, remind_data_path, from_scratch=True,
+                   jobs=1):
     """
     Create and prepare a brightway2 project with updated
     inventories for electricity markets according to
@@ -42,12 +78,24 @@ def create_project(project_name, ecoinvent_path,
     Relies on `premise.NewDatabase`. Existing databases are
     deleted.
 
+    With `jobs` > 1, the databases are prepared in worker processes,
+    see :func:`prepare_database`, all of them starting from the
+    ecoinvent database imported once into the project. The prepared
+    databases are written by the current process, one at a time, as
+    soon as they are ready, see :func:`write_database`. Workers do not
+    read from the project while a database is written. If a worker
+    fails, the databases which are not started yet are cancelled and
+    the exception is raised.
+
     :param str project_name: name of the brightway2 project to modify
     :param str ecoinvent_path: path to the ecoinvent db, at present
         this has to be ecoinvent version 3.6
     :param list years: range of years to create inventories for
-    :param str scenario: the scenario to create inventories for
+    :param scenario: the scenario (or list of scenarios)
+        to create inventories for
+    :type scenario: Union[str, list]
     :param bool from_scratch: should all databases be deleted and recreated?
+    :param int jobs: number of worker processes
 
     """
     bw.projects.set_current(project_name)
@@ -58,40 +106,143 @@ def create_project(project_name, ecoinvent_path,
         for db in dbstr:
             del(bw.databases[db])
             bw.methods.clear()
+        ScoreCache().clear()
 
         bw.bw2setup()
 
     print("Import Ecoinvent.")
-    if 'ecoinvent 3.6 cutoff' in bw.databases:
+    if source_db in bw.databases:
         print("Database has already been imported")
     else:
         ei36 = bw.SingleOutputEcospold2Importer(
-            fpei36, 'ecoinvent 3.6 cutoff')
+            fpei36, source_db)
         ei36.apply_strategies()
         ei36.statistics()
         ei36.write_database()
 
-    for year in years:
-        print("Create modified database for scenario {} and year {}"
-              .format(scenario, year))
+    scenarios = [scenario] if isinstance(scenario, str) else list(scenario)
+    units = [(scen, year) for scen in scenarios for year in years]
+
+    if jobs is None or jobs <= 1 or len(units) <= 1:
+        for scen, year in units:
+            print("Create modified database for scenario {} and year {}"
+                  .format(scen, year))
+            write_database(prepare_database(
+                project_name, scen, year, remind_data_path), scen, year)
+        return
+
+    start = time.time()
+    with multiprocessing.get_context("spawn").Manager() as manager:
+        # held while the project is read by a worker or written to
+        lock = manager.Lock()
+        with process_pool(min(jobs, len(units))) as pool:
+            futures = {
+                pool.submit(prepare_database, project_name, scen, year,
+                            remind_data_path, lock): (scen, year)
+                for scen, year in units}
+            print("Create {} modified databases in {} worker processes."
+                  .format(len(units), min(jobs, len(units))))
+            try:
+                for done, future in enumerate(as_completed(futures)):
+                    scen, year = futures[future]
+                    ndb = future.result()
+                    print("Write database {} ({}/{}, {:.0f} seconds)."
+                          .format(premise.utils.eidb_label(model, scen, year),
+                                  done + 1, len(units), time.time() - start))
+                    write_database(ndb, scen, year, lock)
+                    del ndb
+            except BaseException:
+                # databases being prepared are finished by the pool
+                for future in futures:
+                    future.cancel()
+                raise
+
+
+def prepare_database(project_name, scenario, year, remind_data_path,
+                     lock=None):
+    """
+    Prepare the modified database for a single scenario and year,
+    without writing it to the project, see :func:`write_database`.
+    Used by :func:`create_project` in the current process as well as
+    in worker processes.
+
+    :param str project_name: name of the brightway2 project
+    :param str scenario: the scenario to create inventories for
+    :param int year: the year to create inventories for
+    :param lock: held while the ecoinvent database is read
+        from the project.
+    :type lock: multiprocessing.Lock
+    :returns: the modified database
+    :rtype: premise.NewDatabase
+
+    """
+    if bw.projects.current != project_name:
+        bw.projects.set_current(project_name)
+    start = time.time()
+    with lock or nullcontext():
         ndb = premise.NewDatabase(
             scenario=scenario,
             year=year,
-            source_db='ecoinvent 3.6 cutoff',
+            source_db=source_db,
             source_version=3.6,
             filepath_to_iam_files=remind_data_path)
-        ndb.update_all()
+    ndb.update_all()
+    print("Prepared database for scenario {} and year {} in {:.0f} seconds."
+          .format(scenario, year, time.time() - start))
+    return ndb
+
+
+def write_database(ndb, scenario, year, lock=None):
+    """
+    Write a database prepared by :func:`prepare_database` to the
+    current project with `premise.NewDatabase.write_db_to_brightway`,
+    and remove the cached scores of its previous version.
+
+    :param premise.NewDatabase ndb: the modified database
+    :param str scenario: the scenario of the database
+    :param int year: the year of the database
+    :param lock: held while the database is written.
+    :type lock: multiprocessing.Lock
+
+    """
+    with lock or nullcontext():
         ndb.write_db_to_brightway()
+    ScoreCache().invalidate(premise.utils.eidb_label(model, scenario, year))
 
 
-def load_car_activities(year_range):
+def load_car_activities(year_range, cache=None):
     """Load `carculator` inventories for a given range of years.
 
+    The exported inventories can be stored on disk, under the version
+    of `carculator` and the parameters of the calculation, and are
+    then loaded from there instead of being calculated again.
+
     :param numpy.ndarray year_range: range of years
+    :param cache: folder for exported inventories. Pass `True` to use
+        the `carculator` folder in the `lca2rmnd` directory of the
+        current brightway2 project.
+    :type cache: Union[bool, str]
     :returns: a brightway2 `LCIImporter` object
     :rtype: bw2io.importers.base_lci.LCIImporter
 
     """
+    path = None
+    if cache:
+        if cache is True:
+            cache = Path(bw.projects.request_directory("lca2rmnd")) \
+                / "carculator"
+        key = hashlib.sha256(json.dumps({
+            "carculator": str(getattr(carculator, "__version__", "")),
+            "years": [int(year) for year in year_range],
+            "cycle": cycle,
+            "ecoinvent_compatibility": ecoinvent_compatibility
+        }, sort_keys=True).encode()).hexdigest()
+        path = Path(cache) / "{}.pickle".format(key)
+        if path.exists():
+            print("Load carculator inventories from {}.".format(path))
+            with open(path, "rb") as f:
+                return pickle.load(f)
+
     cip = CarInputParameters()
 
     cip.static()
@@ -101,102 +252,212 @@ def load_car_activities(year_range):
     array = array.interp(
         year=year_range, kwargs={'fill_value': 'extrapolate'})
 
-    cm = CarModel(array, cycle='WLTC')
+    cm = CarModel(array, cycle=cycle)
 
     cm.set_all()
 
     ic = InventoryCalculation(cm.array)
 
-    return ic.export_lci_to_bw(ecoinvent_compatibility=False)[0]
+    inv = ic.export_lci_to_bw(
+        ecoinvent_compatibility=ecoinvent_compatibility)[0]
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(inv, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    return inv
 
 
-def relink_electricity_demand(scenario, year):
+def split_by_year(inv, years):
+    """Split the inventories of several years into one importer per year.
+
+    Datasets are assigned to the year in their name, e.g.,
+    "Passenger car, BEV, Medium, 2030". Datasets without any of the
+    `years` in their name are part of every year.
+
+    :param inv: inventories of all years, see :func:`load_car_activities`
+    :type inv: bw2io.importers.base_lci.LCIImporter
+    :param list years: the years
+    :returns: a copy of `inv` with the datasets of each year, keyed by year
+    :rtype: dict
+
+    """
+    years = [int(year) for year in years]
+    data = {year: [] for year in years}
+    for ds in inv.data:
+        found = [int(match) for match in re.findall(r"\b\d{4}\b", ds["name"])
+                 if int(match) in data]
+        for year in found[-1:] or years:
+            data[year].append(ds)
+
+    result = {}
+    for year in years:
+        part = copy.copy(inv)
+        part.data = copy.deepcopy(data[year])
+        result[year] = part
+    return result
+
+
+def relink_electricity_demand(scenario, year, on_existing="error"):
     """Create LDV activities for REMIND regions and relink
     existing electricity exchanges for BEVs, FCEVs and PHEVs
     to REMIND-compatible (regional) market groups.
 
+    The regional copies of the EV activities and their exchanges
+    are built in memory and written in a single transaction,
+    the database is processed once at the end.
+
     :param eidb: REMIND scenario.
     :param year: REMIND year.
+    :param str on_existing: what to do if the database contains
+        regional (non-GLO) EV activities already, i.e., has been
+        relinked before: "error" raises a `ValueError`, "skip" leaves
+        the database unchanged and "replace" deletes the existing
+        regional activities before relinking.
 
     """
+    if on_existing not in ("error", "skip", "replace"):
+        raise ValueError("Unknown policy for existing activities: {}"
+                         .format(on_existing))
     eidb = bw.Database(premise.utils.eidb_label(model, scenario, year))
     remind_regions = [
         'LAM', 'OAS', 'SSA', 'EUR',
         'NEU', 'MEA', 'REF', 'CAZ',
         'CHA', 'IND', 'JPN', 'USA']
 
-    def find_evs():
-        # find EVs (rexexp function in peewee seems to be broken)
-        return [Activity(sel) for sel in Act.select().where(
-            (Act.name.contains("EV,")
-             | Act.name.contains("PHEV-"))  # PHEV-d and PHEV-p
-            & (Act.database == eidb.name))]
-
-    bevs = find_evs()
+    # find EVs (rexexp function in peewee seems to be broken)
+    evs = list(Act.select().where(
+        (Act.name.contains("EV,")
+         | Act.name.contains("PHEV-"))  # PHEV-d and PHEV-p
+        & (Act.database == eidb.name)))
     # any non-global activities found?
-    non_glo = [act for act in bevs if act["location"] != "GLO"]
+    non_glo = [act for act in evs if act.location != "GLO"]
     if non_glo:
-        print(("Found non-global EV activities: {}"
-               "DB is most likely already updated.").format(non_glo))
-        ans = input("Delete existing non-GLO activities? (y/n)")
-        if ans == "y":
-            for act in non_glo:
-                act.delete()
-            bevs = find_evs()
-        else:
+        message = ("Found {} non-global EV activities in {}, "
+                   "DB is most likely already updated."
+                   .format(len(non_glo), eidb.name))
+        if on_existing == "error":
+            raise ValueError(message)
+        print(message)
+        if on_existing == "skip":
             return
+        evs = [act for act in evs if act.location == "GLO"]
 
-    for region in remind_regions:
-        print("Relinking markets for {}".format(region))
-        # find markets
-        new_market = Activity(Act.get(
+    # low voltage market groups of all regions
+    markets = {
+        act.location: act for act in Act.select().where(
             Act.name.startswith("market group for electricity, low voltage")
-            & (Act.location == region)
-            & (Act.database == eidb.name)))
-        old_market_name = ("electricity market for fuel preparation, {}"
-                           .format(year))
-        for bev in bevs:
-            new_bev = bev.copy()
-            new_bev["location"] = region
-            new_bev.save()
-
-            exchanges = [
-                ex for ex in new_bev.technosphere()
-                if ex["name"] == old_market_name]
+            & Act.location.in_(remind_regions)
+            & (Act.database == eidb.name))}
+    missing = set(remind_regions) - set(markets)
+    if missing:
+        raise ValueError("No low voltage market groups found in {} for {}"
+                         .format(eidb.name, sorted(missing)))
+
+    old_market_name = ("electricity market for fuel preparation, {}"
+                       .format(year))
+    exchanges = {}
+    for exc in Exc.select().where(
+            (Exc.output_database == eidb.name)
+            & Exc.output_code.in_([act.code for act in evs])):
+        exchanges.setdefault(exc.output_code, []).append(exc)
+
+    activities, new_exchanges = [], []
+    for region in remind_regions:
+        market = markets[region]
+        for ev in evs:
+            data = copy.deepcopy(ev.data)
+            # the data of merged activities still holds the
+            # name of the database they were imported to
+            data["database"] = eidb.name
+            data["location"] = region
+            data["code"] = uuid.uuid4().hex
+            key = (eidb.name, data["code"])
+            activities.append(data)
+
+            relinked = 0
+            for row in exchanges.get(ev.code, []):
+                exc = copy.deepcopy(row.data)
+                # keys are taken from the columns, see `Activity.copy`
+                exc["input"] = (row.input_database, row.input_code)
+                # Change `input` for production exchanges
+                if exc["input"] == (row.output_database, row.output_code):
+                    exc["input"] = key
+                exc["output"] = key
+                if exc.get("name") == old_market_name:
+                    relinked += 1
+                    exc = {
+                        "name": market.name,
+                        "amount": exc["amount"],
+                        "unit": "kilowatt hour",
+                        "type": "technosphere",
+                        "location": region,
+                        "uncertainty type": 1,
+                        "reference product": "electricity, low voltage",
+                        "input": (market.database, market.code),
+                        "output": key
+                    }
+                new_exchanges.append(exc)
             # should only be one
-            if len(exchanges) > 1:
+            if relinked > 1:
                 raise ValueError("More than one electricity market for "
                                  "fuel production found for {}"
-                                 .format(new_bev))
-            elif len(exchanges) == 1:
-                # new exchange
-                new_bev.new_exchange(**{
-                    "name": new_market["name"],
-                    "amount": exchanges[0]["amount"],
-                    "unit": "kilowatt hour",
-                    "type": "technosphere",
-                    "location": region,
-                    "uncertainty type": 1,
-                    "reference product": "electricity, low voltage",
-                    "input": new_market.key
-                }).save()
-
-                exchanges[0].delete()
-
-
-def load_and_merge(scenario, years, relink=True):
+                                 .format(ev.name))
+
+    print("Write {} regional EV activities with {} exchanges to {}."
+          .format(len(activities), len(new_exchanges), eidb.name))
+    with sqlite3_lci_db.atomic():
+        if non_glo:
+            codes = [act.code for act in non_glo]
+            Exc.delete().where(
+                (Exc.output_database == eidb.name)
+                & Exc.output_code.in_(codes)).execute()
+            Act.delete().where(
+                (Act.database == eidb.name)
+                & Act.code.in_(codes)).execute()
+        for batch in chunked(activities, 100):
+            Act.insert_many(
+                [dict_as_activitydataset(data) for data in batch]).execute()
+        for batch in chunked(new_exchanges, 100):
+            Exc.insert_many(
+                [dict_as_exchangedataset(data) for data in batch]).execute()
+
+    mapping.add([(eidb.name, data["code"]) for data in activities])
+    geomapping.add(remind_regions)
+    if bw.databases[eidb.name].get("searchable", True):
+        index = IndexManager(eidb.filename)
+        for act in non_glo:
+            index.delete_dataset(act.data)
+        index.add_datasets(activities)
+    bw.databases.set_dirty(eidb.name)
+    eidb.process()
+
+
+def load_and_merge(scenario, years, relink=True, on_existing="error",
+                   cache=None):
     """
     Load carculator outputs and merge them with ecoinvent
     databases for all years.
 
+    The carculator model is evaluated once for all years,
+    the inventories are then split by year, see :func:`split_by_year`.
+
     :param str scenario: REMIND scenario
     :param list years: range of years
     :param bool relink: create BEVs with electricity inputs
         from market groups in REMIND regions
+    :param str on_existing: policy for regional EV activities found
+        when relinking, see :func:`relink_electricity_demand`
+    :param cache: folder for the carculator inventories,
+        see :func:`load_car_activities`
+    :type cache: Union[bool, str]
     """
+    inventories = split_by_year(
+        load_car_activities(np.array(years), cache), years)
     for year in years:
         eidb = premise.utils.eidb_label(model, scenario, year)
-        inv = load_car_activities(np.array([year]))
+        inv = inventories.pop(int(year))
         inv.apply_strategies()
 
         if 'additional_biosphere' not in bw.databases:
@@ -216,4 +477,5 @@ def load_and_merge(scenario, years, relink=True):
         print("Merge carculator results with ecoinvent.")
         merge_databases(eidb, inv.db_name)
         if relink:
-            relink_electricity_demand(scenario, year)
+            relink_electricity_demand(scenario, year, on_existing)
+        ScoreCache().invalidate(eidb)
@@ -0,0 +1,219 @@
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+import json
+import logging
+import os
+import threading
+import time
+
+
+class NullProfiler():
+    """
+    A profiler which records nothing. This is the default profiler of
+    the reporting classes and engines, all of its methods return at once.
+    """
+    enabled = False
+    _null = nullcontext()
+
+    def phase(self, name, **labels):
+        """
+        Return a context manager timing the phase `name`.
+
+        :param name: name of the phase, e.g., "solve".
+        :type name: str
+        :param labels: labels of the phase, e.g., `year` and `region`.
+            Nested phases and counters inherit the labels.
+        """
+        return self._null
+
+    def count(self, name, value=1):
+        """
+        Increase the counter `name` by `value`.
+
+        :param name: name of the counter, e.g., "lci".
+        :type name: str
+        :param value: increment.
+        :type value: float
+        """
+
+    def merge(self, other):
+        """
+        Add the events and counters of another profiler,
+        e.g., from a worker process.
+        """
+
+
+class Profiler(NullProfiler):
+    """
+    Record the wall time of nested phases and counters, labelled by the
+    labels (e.g., year and region) of the enclosing phases.
+
+    SQL queries are counted with a filter on the `peewee` logger while
+    the profiler is active, i.e., within any of its phases.
+
+    :ivar events: the recorded phases as tuples of name, start time,
+        duration (both in seconds), labels, process and thread id.
+    :vartype events: list
+    :ivar counters: counter values, keyed by name and labels.
+    :vartype counters: dict
+    """
+    enabled = True
+
+    def __init__(self):
+        self.events = []
+        self.counters = defaultdict(float)
+        self._local = threading.local()
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {"events": self.events, "counters": dict(self.counters)}
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.events = state["events"]
+        self.counters.update(state["counters"])
+
+    def _labels(self):
+        stack = getattr(self._local, "labels", None)
+        return stack[-1] if stack else {}
+
+    def _activate(self, delta):
+        logger = logging.getLogger("peewee")
+        with self._lock:
+            self._active += delta
+            if delta > 0 and self._active == 1:
+                self._level = logger.level
+                self._filter = _QueryFilter(self, logger.getEffectiveLevel())
+                logger.addFilter(self._filter)
+                logger.setLevel(logging.DEBUG)
+            elif delta < 0 and self._active == 0:
+                logger.removeFilter(self._filter)
+                logger.setLevel(self._level)
+
+    @contextmanager
+    def phase(self, name, **labels):
+        if not hasattr(self._local, "labels"):
+            self._local.labels = []
+        merged = dict(self._labels(), **labels)
+        self._local.labels.append(merged)
+        self._activate(1)
+        start = time.time()
+        clock = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - clock
+            self._activate(-1)
+            self._local.labels.pop()
+            with self._lock:
+                self.events.append((name, start, duration, merged,
+                                    os.getpid(), threading.get_ident()))
+
+    def count(self, name, value=1):
+        key = (name, tuple(sorted(self._labels().items())))
+        with self._lock:
+            self.counters[key] += value
+
+    def merge(self, other):
+        with self._lock:
+            self.events.extend(other.events)
+            for key, value in other.counters.items():
+                self.counters[key] += value
+
+    def summary(self, by=("year", "region")):
+        """
+        Summarize the phases and counters.
+
+        :param by: labels to break the results down by.
+        :type by: tuple
+        :return: total wall time and number of calls per phase, counter
+            totals and the same figures per combination of the labels
+            `by`, keyed by a string like "year=2030,region=EUR".
+        :rtype: dict
+        """
+        def empty():
+            return {"phases": defaultdict(lambda: {"calls": 0, "seconds": 0.}),
+                    "counters": defaultdict(float)}
+
+        total = empty()
+        breakdown = defaultdict(empty)
+        for name, _, duration, labels, _, _ in self.events:
+            parts = [total]
+            if any(label in labels for label in by):
+                parts.append(breakdown[_key(labels, by)])
+            for part in parts:
+                part["phases"][name]["calls"] += 1
+                part["phases"][name]["seconds"] += duration
+        for (name, labels), value in self.counters.items():
+            labels = dict(labels)
+            total["counters"][name] += value
+            if any(label in labels for label in by):
+                breakdown[_key(labels, by)]["counters"][name] += value
+
+        def plain(part):
+            return {"phases": {k: dict(v) for k, v in part["phases"].items()},
+                    "counters": dict(part["counters"])}
+        result = plain(total)
+        result["breakdown"] = {key: plain(part)
+                               for key, part in sorted(breakdown.items())}
+        return result
+
+    def to_json(self, path):
+        """
+        Write the summary, see :meth:`summary`, to a JSON file.
+        """
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2, default=str)
+
+    def to_chrome_trace(self, path):
+        """
+        Write the phases as complete events and the counters as counter
+        events of the Chrome trace event format, to be opened in
+        `chrome://tracing` or Perfetto.
+        """
+        events = [{
+            "name": name, "ph": "X", "ts": start * 1e6, "dur": duration * 1e6,
+            "pid": pid, "tid": tid,
+            "args": {key: str(value) for key, value in labels.items()}
+        } for name, start, duration, labels, pid, tid in self.events]
+        end = max((event["ts"] + event["dur"] for event in events),
+                  default=0.)
+        totals = self.summary(by=())["counters"]
+        events.extend({"name": name, "ph": "C", "ts": end, "pid": os.getpid(),
+                       "args": {name: value}}
+                      for name, value in totals.items())
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events}, f, default=str)
+
+
+class _QueryFilter(logging.Filter):
+    """
+    Count the queries logged by peewee, and drop the records
+    below the level the logger had before profiling.
+    """
+    def __init__(self, profiler, level):
+        super().__init__()
+        self.profiler = profiler
+        self.level = level
+
+    def filter(self, record):
+        self.profiler.count("sql")
+        return record.levelno >= self.level
+
+
+def _key(labels, by):
+    return ",".join("{}={}".format(label, labels[label])
+                    for label in by if label in labels)
+
+
+def profiled(func):
+    """
+    Time a report method as a phase of the profiler of its object.
+    """
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        with self.profiler.phase(func.__name__):
+            return func(self, *args, **kwargs)
+    return wrapper
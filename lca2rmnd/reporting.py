@@ -1,6 +1,12 @@
 from . import DATA_DIR
 from .data_collection import RemindDataCollection
 from .activity_select import ActivitySelector
+from .cache import ScoreCache
+from .engine import LCAEngine, MethodStack
+from .intensity import IntensityStore
+from .montecarlo import MonteCarloScores, RunningStats
+from .parallel import iter_units, process_pool, run_units
+from .profiling import NullProfiler, profiled
 from .utils import project_string
 
 from premise import Geomap
@@ -8,14 +14,19 @@ from premise.activity_maps import InventorySet
 from premise.utils import eidb_label
 
 from bw2data.backends.peewee.proxies import Activity, ActivityDataset as Act
+from bw2data.backends.peewee.schema import ExchangeDataset as Exc
 import brightway2 as bw
+import numpy as np
 import pandas as pd
-from bw2analyzer import ContributionAnalysis
+import xarray as xr
 
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 import time
 
 
-class LCAReporting():
+class LCAReporting(ABC):
     """
     The base class for LCA Reports for REMIND output.
 
@@ -33,16 +44,68 @@ class LCAReporting():
     :ivar indicatorgroup: name of the set of indicators to
         calculate the scores for, defaults to ReCiPe Midpoint (H)
     :vartype source_db: str
+    :ivar jobs: number of worker processes used by the report methods,
+        each processing one year database at a time. Defaults to 1,
+        i.e., all years are processed in the current process.
+    :vartype jobs: int
+    :ivar cache: persistent cache for LCA scores. Pass `True` to use
+        the default cache file of the brightway2 project.
+    :vartype cache: Union[bool, lca2rmnd.cache.ScoreCache]
+    :ivar shared: another reporting object for the same methods. Its
+        method stack, geomatcher, activity indices, unit results and
+        caches are reused instead of building them again.
+    :vartype shared: LCAReporting
+    :ivar solver: solver mode of the engines, "direct" or "iterative".
+        In iterative mode, the years are processed one after another
+        in the current process and each year database is solved starting
+        from the previous one, see :class:`lca2rmnd.engine.LCAEngine`.
+    :vartype solver: str
+    :ivar tol: relative tolerance of the iterative solver.
+    :vartype tol: float
+    :ivar profiler: profiler for the report methods, see
+        :class:`lca2rmnd.profiling.Profiler`. The phases of each year
+        are labelled with `year` and `scenario`, the calculations
+        per region with `region`. Profiling is off by default.
+    :vartype profiler: lca2rmnd.profiling.Profiler
     """
+
+    # REMIND variables (or prefixes ending in "|") read from the output file,
+    # `None` reads all of them
+    remind_variables = None
+
     def __init__(self, scenario, years, project,
                  remind_output_folder,
-                 methods, regions=None):
+                 methods, regions=None, jobs=1, cache=None, shared=None,
+                 solver="direct", tol=1e-8, profiler=None):
         self.years = years
         self.scenario = scenario
         self.model = "remind"
+        self.project = project
+        self.jobs = jobs
+        # process pool shared with other reporting objects
+        self.pool = None
+        self.solver = solver
+        self.tol = tol
+        # engine of the previous year in iterative mode
+        self.previous_engine = None
+        self.profiler = profiler or NullProfiler()
         bw.projects.set_current(project)
-        self.selector = ActivitySelector()
         self.methods = methods
+        if shared is None:
+            # an empty cache is falsy, see `ScoreCache.__len__`
+            self.cache = ScoreCache() if cache is True else (
+                cache if isinstance(cache, ScoreCache) else None)
+            self.selector = ActivitySelector()
+            # activities, keyed by (database name, name prefix)
+            self.activity_index = {}
+            self.method_stack = MethodStack(self.methods)
+            self.intensities = IntensityStore(self.cache)
+        else:
+            self.cache = shared.cache
+            self.selector = shared.selector
+            self.activity_index = shared.activity_index
+            self.method_stack = shared.method_stack
+            self.intensities = shared.intensities
 
         if not self.methods:
             raise ValueError(("No methods found in the current brightway2"
@@ -57,7 +120,11 @@ class LCAReporting():
         #     raise ValueError(
         #         "The following brightway2 databases are missing: {}"
         #         .format(missing))
-        rdc = RemindDataCollection(self.scenario, remind_output_folder)
+        with self.profiler.phase("remind_data", scenario=self.scenario):
+            rdc = RemindDataCollection(
+                self.scenario, remind_output_folder,
+                variables=self.remind_variables, regions=regions,
+                years=self.years)
         self.data = rdc.data[rdc.data.Year.isin(self.years) &
                              (rdc.data.Region != "World")]
         if regions is None:
@@ -66,8 +133,221 @@ class LCAReporting():
             # all regions there?
             self.regions = regions
             assert self.regions in self.data.Region.unique()
+        self.geo = Geomap(self.model) if shared is None else shared.geo
+
+    def __getstate__(self):
+        # the geomatcher and activity indices are rebuilt in worker processes
+        state = self.__dict__.copy()
+        del state["geo"]
+        state["activity_index"] = {}
+        state["intensities"] = IntensityStore(self.cache)
+        state["pool"] = None
+        state["previous_engine"] = None
+        # worker processes record into their own profiler,
+        # which is merged after each unit, see `_map_years`
+        state["profiler"] = type(self.profiler)()
+        # only the activity table of the year database is sent along with
+        # a unit, see `_unit`, the worker loads any other table itself
+        names = state.pop("unit_databases", ())
+        state["selector"] = ActivitySelector()
+        state["selector"].tables = {
+            name: table for name, table in self.selector.tables.items()
+            if name in names}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
         self.geo = Geomap(self.model)
 
+    def _unit(self, year):
+        """
+        Return a shallow copy to process `year` in a worker process.
+        When pickled, the copy holds only the in-memory tables of the
+        year database, see :meth:`__getstate__`.
+        """
+        unit = object.__new__(type(self))
+        unit.__dict__.update(self.__dict__)
+        unit.unit_databases = {
+            eidb_label(self.model, self.scenario, year),
+            "_".join(["ecoinvent", self.scenario, str(year)])}
+        return unit
+
+    def _activities(self, db, prefix):
+        """
+        Return all activities of `db` whose name starts with `prefix`,
+        keyed by name and location. The activities are loaded with a
+        single query on first use.
+        """
+        if (db.name, prefix) not in self.activity_index:
+            self.activity_index[(db.name, prefix)] = {
+                (act.name, act.location): Activity(act)
+                for act in Act.select().where(
+                    Act.name.startswith(prefix)
+                    & (Act.database == db.name))
+            }
+        return self.activity_index[(db.name, prefix)]
+
+    def _engine(self):
+        """
+        Create a new engine for the calculations in a single year database.
+        In iterative mode, the engine continues from the engine created
+        before.
+        """
+        if self.solver == "direct":
+            return LCAEngine(cache=self.cache, profiler=self.profiler)
+        self.previous_engine = LCAEngine(
+            cache=self.cache, mode=self.solver,
+            previous=self.previous_engine, tol=self.tol,
+            profiler=self.profiler)
+        return self.previous_engine
+
+    def _names(self, keys):
+        """
+        Return the names of the activities or biosphere flows with
+        `keys`, loaded with a single query.
+        """
+        keys = set(keys)
+        return {
+            (act.database, act.code): act.name
+            for act in Act.select().where(
+                Act.code.in_([code for _, code in keys]))
+            if (act.database, act.code) in keys
+        }
+
+    @abstractmethod
+    def _demands(self, year):
+        """
+        Return the demand dictionaries of all regions for a single year,
+        keyed by region. Used by :meth:`report_contributions`.
+        """
+
+    @profiled
+    def report_contributions(self, n=10, jobs=None):
+        """
+        Report the processes and biosphere flows with the largest
+        contributions to the scores of each year, region and method.
+        The demands are those of :meth:`_demands`, i.e., the full fleet
+        for transport and one kWh of low voltage electricity for
+        the electricity sector. The demands of each year are solved
+        once, and the process and flow contributions of all methods are
+        calculated from these supply arrays. Supply arrays are not kept
+        between report methods.
+
+        :param n: number of processes and flows to report.
+        :type n: int
+        :param jobs: number of worker processes, defaults to `self.jobs`.
+        :type jobs: int
+        :return: A `pandas.DataFrame` with index `year`, `region`, `method`,
+            `kind` ("process" or "flow") and `rank`, and the columns
+            `key`, `name` and `score`.
+        """
+        start = time.time()
+        result = self._map_years("_contributions", (n,), jobs=jobs)
+        df = pd.DataFrame(
+            list(result.values()), columns=["key", "score"],
+            index=pd.MultiIndex.from_tuples(
+                list(result),
+                names=["year", "region", "method", "kind", "rank"]))
+        df.insert(1, "name", df["key"].map(self._names(df["key"])))
+        print("Calculation took {} seconds.".format(time.time() - start))
+        return df
+
+    def _contributions(self, year, n):
+        """
+        Find the top contributors of all regions for a single year.
+        """
+        demands = self._demands(year)
+        regions = list(demands)
+        engine = self._engine()
+        processes, flows = engine.contributions(
+            [demands[region] for region in regions], self.method_stack,
+            n, labels=regions)
+        result = {}
+        for kind, (idx, values), keys in [
+                ("process", processes, engine.activity_keys()),
+                ("flow", flows, engine.flow_keys())]:
+            for r, region in enumerate(regions):
+                for m, method in enumerate(self.methods):
+                    for rank in range(idx.shape[2]):
+                        result[(year, region, method, kind, rank + 1)] = (
+                            keys[idx[r, m, rank]], values[r, m, rank])
+        return result
+
+    def _map_years(self, name, args=(), jobs=None, years=None, write=None):
+        """
+        Call the method `name` with arguments `(year, *args)` for all years
+        and merge the resulting dictionaries.
+
+        :param name: name of a method returning a dictionary of results
+            for a single year.
+        :type name: str
+        :param args: additional arguments for the method.
+        :type args: tuple
+        :param jobs: number of worker processes, defaults to `self.jobs`.
+        :type jobs: int
+        :param years: the years to run, defaults to `self.years`.
+        :type years: list
+        :param write: a function to pass the results of each year to,
+            as soon as they are available, instead of merging them.
+        :type write: callable
+        :return: the merged results of all years, empty if
+            `write` is given.
+        :rtype: dict
+        """
+        years = self.years if years is None else years
+        if self.solver == "iterative":
+            # consecutive years are solved one after another
+            years, jobs = sorted(years), 1
+            self.previous_engine = None
+        jobs = jobs or self.jobs
+        pool = None if self.solver == "iterative" else self.pool
+        # units sent to worker processes get a copy with the tables of
+        # their year only, units run here use the object itself
+        remote = pool is not None or (jobs or 1) > 1 and len(years) > 1
+        units = [(self.project, self._unit(year) if remote else self,
+                  "_profiled", (name, year) + tuple(args))
+                 for year in years]
+        result = {}
+        for part, profiler in iter_units(units, jobs, pool):
+            if write is None:
+                result.update(part)
+            else:
+                write(part)
+            if profiler is not self.profiler:
+                # recorded in a worker process
+                self.profiler.merge(profiler)
+        self.previous_engine = None
+        return result
+
+    def _series(self, name, args, jobs, sink, report, dims, convert):
+        """
+        Run the method `name` for all years, see :meth:`_map_years`,
+        and convert the results with `convert`.
+
+        :param sink: if given, the converted results of each year are
+            written to the sink under the name `report` and the
+            dimensions `dims`, instead of being kept in memory.
+        :type sink: lca2rmnd.sink.ResultSink
+        :return: the results as `pandas.Series`, or `None` with a sink.
+        """
+        if sink is None:
+            return pd.Series(convert(self._map_years(name, args, jobs=jobs)))
+        sink.clear(report, self.scenario)
+        self._map_years(
+            name, args, jobs=jobs, write=lambda part: sink.write(
+                report, self.scenario, dims, convert(part)))
+
+    def _profiled(self, name, year, *args):
+        """
+        Call the method `name` for a single year as a profiler phase.
+
+        :return: the result of the method and the profiler
+        :rtype: tuple
+        """
+        with self.profiler.phase(name, year=year, scenario=self.scenario):
+            result = getattr(self, name)(year, *args)
+        return result, self.profiler
+
 
 class TransportLCAReporting(LCAReporting):
     """
@@ -94,67 +374,169 @@ class TransportLCAReporting(LCAReporting):
     # available variables
     techs = ["BEV", "FCEV", "Gases", "Hybrid Liquids", "Hybrid Electric", "Liquids"]
     variables = ["ES|Transport|VKM|Pass|Road|LDV|" + tech for tech in techs]
+    remind_variables = ["ES|Transport|"]
+
+    techmap = {
+        "BEV": "battery electric",
+        "FCEV": "fuel cell electric",
+        "Gases": "compressed gas",
+        "Hybrid Electric": {
+            "diesel": "plugin diesel hybrid",
+            "petrol": "plugin gasoline hybrid"
+        },
+        "Hybrid Liquids": {
+            "diesel": "diesel hybrid",
+            "petrol": "gasoline hybrid"
+        },
+        "Liquids": {
+            "diesel": "diesel",
+            "petrol": "gasoline"
+        }
+    }
+    # drivetrains running on diesel or petrol
+    liquid_techs = ["Hybrid Electric", "Hybrid Liquids", "Liquids"]
+    # shares of diesel and petrol cars
+    liq_share = {
+        "diesel": 0.4,
+        "petrol": 0.6
+    }
+    # regions without diesel cars
+    petrol_only_regions = ["CHA", "REF", "IND"]
+    # minimum occupancy factor in `_LowD` scenarios, reached after
+    # `lowd_years` years from `lowd_start`
+    lowd_factor = 0.85
+    lowd_start = 2020
+    lowd_years = 15
+
+    def _fuel_activities(self, variable, db, year, region):
+        """
+        Find the diesel and petrol activities for a given REMIND transport
+        reporting variable. For drivetrains without liquid fuels and
+        in `petrol_only_regions`, both are the same activity.
+        """
+        tech = variable.split("|")[-1]
+        acts = self._fleet_activities(db)
+        name = "transport, passenger car, fleet average, {}, {}"
+        if tech in self.liquid_techs:
+            if region in self.petrol_only_regions:
+                act = acts[(name.format(self.techmap[tech]["petrol"], year),
+                            region)]
+                return {"diesel": act, "petrol": act}
+            return {
+                liq: acts[(name.format(self.techmap[tech][liq], year),
+                           region)]
+                for liq in ["diesel", "petrol"]
+            }
+        act = acts[(name.format(self.techmap[tech], year), region)]
+        return {"diesel": act, "petrol": act}
 
     def _act_from_variable(self, variable, db, year, region, scale=1):
         """
         Find the activity for a given REMIND transport reporting variable.
+        Liquid fuels are split according to `liq_share`.
         """
-        techmap = {
-            "BEV": "battery electric",
-            "FCEV": "fuel cell electric",
-            "Gases": "compressed gas",
-            "Hybrid Electric": {
-                "diesel": "plugin diesel hybrid",
-                "petrol": "plugin gasoline hybrid"
-            },
-            "Hybrid Liquids": {
-                "diesel": "diesel hybrid",
-                "petrol": "gasoline hybrid"
-            },
-            "Liquids": {
-                "diesel": "diesel",
-                "petrol": "gasoline"
-            }
-        }
-        tech = variable.split("|")[-1]
-        liq_share = {
-            "diesel": 0.4,
-            "petrol": 0.6
-        }
-        if tech in ["Hybrid Electric", "Hybrid Liquids", "Liquids"]:
-            if region in ["CHA", "REF", "IND"]:
-                demand = {
-                    Activity(Act.get(
-                        (Act.name == "transport, passenger car, fleet average, {}, {}".format(
-                            techmap[tech]["petrol"], year))
-                        & (Act.location == region)
-                        & (Act.database == db.name))): scale
-                }
-            else:
-                demand = {
-                    Activity(Act.get(
-                        (Act.name == "transport, passenger car, fleet average, {}, {}".format(
-                            techmap[tech][liq], year))
-                        & (Act.location == region)
-                        & (Act.database == db.name))): scale * liq_share[liq]
-                    for liq in ["diesel", "petrol"]
-                }
-            return demand
-        else:
-            return  {
-                Activity(
-                    Act.get(
-                        (Act.name == "transport, passenger car, fleet average, {}, {}".format(
-                            techmap[tech], year))
-                        & (Act.location == region)
-                        & (Act.database == db.name))): scale
-            }
+        acts = self._fuel_activities(variable, db, year, region)
+        if acts["diesel"].key == acts["petrol"].key:
+            return {acts["petrol"]: scale}
+        return {acts[liq]: scale * self.liq_share[liq]
+                for liq in ["diesel", "petrol"]}
 
-    def report_LDV_LCA(self):
+    def _fleet_activities(self, db):
+        """
+        Return all fleet average passenger car activities of `db`,
+        keyed by name and location.
+        """
+        return self._activities(
+            db, "transport, passenger car, fleet average")
+
+    def _ldv_data(self):
+        """
+        REMIND data for the LDV variables, indexed by
+        year, region and variable.
+        """
+        df = self.data[self.data.Variable.isin(self.variables)]
+        return df.set_index(["Year", "Region", "Variable"]).sort_index()
+
+    def _demands(self, year):
+        """
+        Return the fleet demands of all regions for a single year.
+        """
+        df = self._ldv_data()
+        db = bw.Database(eidb_label(self.model, self.scenario, year))
+        return {region: self._fleet_demand(df, db, year, region)
+                for region in self.regions}
+
+    def _fleet_levels(self, year):
+        """
+        Return the activity levels of the vehicle activities of the
+        full LDV fleet of all regions for a single year.
+
+        :return: a dataframe with the columns `Region`, `key` (of the
+            vehicle activity) and `level`.
+        :rtype: pandas.DataFrame
+        """
+        df = self._ldv_data()
+        db = bw.Database(eidb_label(self.model, self.scenario, year))
+        return pd.DataFrame([
+            (region, act.key, level)
+            for region in self.regions
+            for var in (df.loc[(year, region)]
+                        .index.get_level_values(0)
+                        .unique())
+            for act, level in self._act_from_variable(
+                    var, db, year, region,
+                    scale=df.loc[(year, region, var), "value"]).items()
+        ], columns=["Region", "key", "level"])
+
+    def _fleet_totals(self, levels, intensities):
+        """
+        Multiply the unit results of the vehicle activities with their
+        levels and sum them up per region.
+
+        :param levels: activity levels, see :meth:`_fleet_levels`.
+        :type levels: pandas.DataFrame
+        :param intensities: unit results, one row per unique key
+            in the order of appearance in `levels`.
+        :type intensities: numpy.ndarray
+        :return: a dataframe with one row per region (of `self.regions`)
+            and one column per column of `intensities`.
+        :rtype: pandas.DataFrame
+        """
+        rows = pd.Index(levels.key.unique()).get_indexer(levels.key)
+        totals = pd.DataFrame(
+            intensities[rows] * levels.level.values[:, None],
+            index=levels.Region.values,
+            columns=range(intensities.shape[1]))
+        return totals.groupby(level=0).sum()\
+                     .reindex(self.regions, fill_value=0.)
+
+    def _fleet_demand(self, df, db, year, region):
+        """
+        Create a single demand dictionary for the full LDV fleet
+        of a region, scaled by the REMIND activity levels in `df`.
+        """
+        demand = [
+            self._act_from_variable(
+                var, db, year, region,
+                scale=df.loc[(year, region, var), "value"])
+            for var in (df.loc[(year, region)]
+                        .index.get_level_values(0)
+                        .unique())]
+        # flatten dictionaries
+        demand_flat = {}
+        for item in demand:
+            for act, val in item.items():
+                demand_flat[act] = val + demand_flat.get(act, 0)
+        return demand_flat
+
+    @profiled
+    def report_LDV_LCA(self, jobs=None):
         """
         Report per-drivetrain impacts along the given dimension.
         Both per-pkm as well as total numbers are given.
 
+        :param jobs: number of worker processes, defaults to `self.jobs`.
+        :type jobs: int
         :return: a dataframe with impacts for the REMIND EDGE-T
             transport sector model. Levelized impacts (per pkm) are
             found in the column `score_pkm`, total impacts in `total_score`.
@@ -173,33 +555,224 @@ class TransportLCAReporting(LCAReporting):
         start = time.time()
 
         # calc score
-        for year in self.years:
-            # find activities which at the moment do not depend
-            # on regions
-            db = bw.Database(eidb_label(self.model, self.scenario, year))
-            for region in self.regions:
-                for var in (df.loc[(year, region)]
-                            .index.get_level_values(0)
-                            .unique()):
-                    demand = self._act_from_variable(var, db, year, region)
-                    lca = bw.LCA(demand,
-                                 method=self.methods[0])
-                    # build inventories
-                    lca.lci()
-
-                    if "_LowD" in self.scenario:
-                        fct = max(1 - (year - 2020)/15 * 0.15, 0.85)
-                    else:
-                        fct = 1.
-                    for method in self.methods:
-                        lca.switch_method(method)
-                        lca.lcia()
-                        df.loc[(year, region, var, method),
-                               "score_pkm"] = lca.score * fct
+        result = self._map_years("_ldv_scores", jobs=jobs)
+        df["score_pkm"] = pd.Series(result).reindex(df.index).fillna(0.)
         print("Calculation took {} seconds.".format(time.time() - start))
         df["total_score"] = df["value"] * df["score_pkm"] * 1e9
         return df[["total_score", "score_pkm"]]
 
+    def _ldv_scores(self, year):
+        """
+        Calculate the per-pkm scores of all LDV variables
+        and regions for a single year.
+        """
+        engine = self._engine()
+        fct = self._occupancy_factor(year)
+        result = {}
+        for (region, var), demand in self._ldv_demands(year).items():
+            with self.profiler.phase("scores", region=region):
+                scores = engine.scores(
+                    demand, self.method_stack, (region, var))
+            for method, score in zip(self.methods, scores):
+                result[(year, region, var, method)] = score * fct
+        return result
+
+    def _occupancy_factor(self, year, floor=None):
+        """
+        Return the factor for the higher occupancy of cars in `_LowD`
+        scenarios. The factor decreases linearly to `floor`, which
+        defaults to `lowd_factor`. Other scenarios use a factor of 1,
+        unless `floor` is given.
+        """
+        if floor is None:
+            if "_LowD" not in self.scenario:
+                return 1.
+            floor = self.lowd_factor
+        return max(1 - (year - self.lowd_start)/self.lowd_years * (1 - floor),
+                   floor)
+
+    def _ldv_demands(self, year):
+        """
+        Return the demands of one pkm for all LDV variables
+        and regions of a single year, keyed by region and variable.
+        """
+        df = self._ldv_data()
+        # find activities which at the moment do not depend
+        # on regions
+        db = bw.Database(eidb_label(self.model, self.scenario, year))
+        return {
+            (region, var): self._act_from_variable(var, db, year, region)
+            for region in self.regions
+            for var in (df.loc[(year, region)]
+                        .index.get_level_values(0)
+                        .unique())
+        }
+
+    @profiled
+    def report_LDV_uncertainty(self, iterations=100, directory=None,
+                               seed=0, chunksize=10, jobs=None):
+        """
+        Monte Carlo analysis of the per-pkm scores of
+        :meth:`report_LDV_LCA`, see
+        :class:`lca2rmnd.montecarlo.MonteCarloScores`.
+
+        The iterations of each year are split among the worker processes.
+        All samples are written to `directory`, one set of files per year,
+        and can be read with :func:`lca2rmnd.montecarlo.read_samples`.
+        Like the summary statistics, the samples include the occupancy
+        factor of the year. Only summary statistics are kept in memory.
+
+        :param iterations: number of iterations per year.
+        :type iterations: int
+        :param directory: output directory for the samples, defaults to
+            `montecarlo/<scenario>` in the `lca2rmnd` directory
+            of the brightway2 project.
+        :type directory: str
+        :param seed: seed of the random number generators.
+        :type seed: int
+        :param chunksize: number of iterations per file.
+        :type chunksize: int
+        :param jobs: number of worker processes, defaults to `self.jobs`.
+        :type jobs: int
+        :return: a dataframe with the index `Year`, `Region`, `Variable`
+            and `Method` and the columns `mean`, `std`, `min` and `max`
+            of the per-pkm scores.
+        :rtype: pandas.DataFrame
+        """
+        if directory is None:
+            directory = Path(bw.projects.request_directory("lca2rmnd")) \
+                / "montecarlo" / self.scenario
+        jobs = jobs or self.jobs
+        bounds = np.linspace(0, iterations, max(1, min(jobs, iterations)) + 1)\
+                   .astype(int)
+
+        start = time.time()
+        units = []
+        labels = {}
+        for year in self.years:
+            demands = self._ldv_demands(year)
+            labels[year] = list(demands)
+            mc = MonteCarloScores(
+                list(demands.values()), labels[year], self.methods,
+                directory, chunksize, scale=self._occupancy_factor(year))
+            mc.prepare(str(year))
+            for batch, offset in enumerate(bounds[:-1]):
+                units.append((self.project, mc, "run", (
+                    int(bounds[batch + 1] - offset), [seed, year, batch],
+                    str(year), int(offset))))
+
+        stats = {year: RunningStats((len(labels[year]), len(self.methods)))
+                 for year in self.years}
+        for (_, _, _, args), part in zip(
+                units, run_units(units, jobs, self.pool)):
+            stats[int(args[2])].merge(part)
+
+        rows = {}
+        for year in self.years:
+            for d, (region, var) in enumerate(labels[year]):
+                for m, method in enumerate(self.methods):
+                    st = stats[year]
+                    rows[(year, region, var, method)] = [
+                        st.mean[d, m], st.std[d, m], st.min[d, m],
+                        st.max[d, m]]
+        result = pd.DataFrame(
+            list(rows.values()), columns=["mean", "std", "min", "max"],
+            index=pd.MultiIndex.from_tuples(
+                list(rows), names=["Year", "Region", "Variable", "Method"]))
+        print("Calculation took {} seconds.".format(time.time() - start))
+        return result
+
+    @profiled
+    def report_LDV_sweep(self, diesel_shares, occupancy_factors=None,
+                         jobs=None):
+        """
+        Evaluate the per-pkm scores of :meth:`report_LDV_LCA` for a grid
+        of diesel shares and occupancy factors.
+
+        The scores of the diesel and petrol activities are calculated once
+        per year. As the scores are linear in the shares, all grid points
+        are then computed with array operations. The diesel share does not
+        apply to drivetrains without liquid fuels and to
+        `petrol_only_regions`.
+
+        :param diesel_shares: shares of diesel cars among liquid fuel cars,
+            replacing `liq_share`.
+        :type diesel_shares: list
+        :param occupancy_factors: minimum occupancy factors, see
+            :meth:`_occupancy_factor`. Defaults to the factor of the scenario.
+        :type occupancy_factors: list
+        :param jobs: number of worker processes, defaults to `self.jobs`.
+        :type jobs: int
+        :return: an array of per-pkm scores with the dimensions `year`,
+            `region`, `variable`, `method`, `diesel_share` and `occupancy`.
+            Variables without REMIND data are `NaN`.
+        :rtype: xarray.DataArray
+        """
+        start = time.time()
+        result = self._map_years("_fuel_scores", jobs=jobs)
+        coords = {
+            "year": list(self.years),
+            "region": list(self.regions),
+            "variable": list(self.variables),
+            "method": pd.Index(self.methods, tupleize_cols=False)
+        }
+        fuels = {}
+        for f, fuel in enumerate(["diesel", "petrol"]):
+            scores = np.full([len(c) for c in coords.values()], np.nan)
+            for y, year in enumerate(self.years):
+                for r, region in enumerate(self.regions):
+                    for v, var in enumerate(self.variables):
+                        if (year, region, var) in result:
+                            scores[y, r, v] = result[(year, region, var)][f]
+            fuels[fuel] = xr.DataArray(scores, coords=coords,
+                                       dims=list(coords))
+
+        shares = xr.DataArray(
+            list(diesel_shares), coords={"diesel_share": list(diesel_shares)},
+            dims=["diesel_share"])
+        if occupancy_factors is None:
+            occupancy_factors = [
+                self.lowd_factor if "_LowD" in self.scenario else 1.]
+        factors = xr.DataArray(
+            [[self._occupancy_factor(year, floor)
+              for floor in occupancy_factors] for year in self.years],
+            coords={"year": list(self.years),
+                    "occupancy": list(occupancy_factors)},
+            dims=["year", "occupancy"])
+
+        cube = (shares * fuels["diesel"] + (1 - shares) * fuels["petrol"]) \
+            * factors
+        print("Calculation took {} seconds.".format(time.time() - start))
+        return cube.transpose("year", "region", "variable", "method",
+                              "diesel_share", "occupancy")
+
+    def _fuel_scores(self, year):
+        """
+        Calculate the per-pkm scores of the diesel and petrol activities
+        of all LDV variables and regions for a single year.
+        """
+        df = self._ldv_data()
+        db = bw.Database(eidb_label(self.model, self.scenario, year))
+        acts, labels = {}, {}
+        for region in self.regions:
+            for var in (df.loc[(year, region)]
+                        .index.get_level_values(0)
+                        .unique()):
+                fuel_acts = self._fuel_activities(var, db, year, region)
+                acts[(region, var)] = [fuel_acts["diesel"].key,
+                                       fuel_acts["petrol"].key]
+                for act in fuel_acts.values():
+                    # labels match between years for warm starts,
+                    # so the year is dropped from the name
+                    labels[act.key] = (act["name"].rsplit(", ", 1)[0],
+                                       act["location"], act["unit"])
+        keys = sorted({key for pair in acts.values() for key in pair})
+        scores = dict(zip(keys, self._engine().scores_many(
+            [{key: 1} for key in keys], self.method_stack,
+            [labels[key] for key in keys])))
+        return {(year, region, var): [scores[key] for key in pair]
+                for (region, var), pair in acts.items()}
+
     def _get_material_bioflows_for_bev(self):
         """
         Obtain bioflow ids for *interesting* materials.
@@ -214,103 +787,181 @@ class TransportLCAReporting(LCAReporting):
 
         # upstream material demands are the same for all regions
         # so we can use GLO here
-        act = Activity(
-            Act.get((Act.name == act_str)
-                    & (Act.database == eidb_label(
-                        self.model, self.scenario, year))
-                    & (Act.location == "EUR")))
-        lca = bw.LCA({act: 1}, method=method)
-        lca.lci()
-        lca.lcia()
-
-        inv_bio = {value: key for key, value in lca.biosphere_dict.items()}
-
-        ca = ContributionAnalysis()
-        ef_contrib = ca.top_emissions(lca.characterized_inventory)
-        return [inv_bio[int(el[1])] for el in ef_contrib]
-
-    def report_materials(self):
+        db = bw.Database(eidb_label(self.model, self.scenario, year))
+        act = self._fleet_activities(db)[(act_str, "EUR")]
+        engine = LCAEngine(profiler=self.profiler)
+        _, (idx, _) = engine.contributions([{act: 1}], [method], n=25)
+        flows = engine.flow_keys()
+        return [flows[i] for i in idx[0, 0]]
+
+    @profiled
+    def report_materials(self, jobs=None, sink=None):
         """
         Report the material demand of the LDV fleet for all regions and years.
 
+        :param jobs: number of worker processes, defaults to `self.jobs`.
+        :type jobs: int
+        :param sink: write the results of each year to a result sink
+            instead of returning them, see :class:`lca2rmnd.sink.ResultSink`.
+        :type sink: lca2rmnd.sink.ResultSink
         :return: A `pandas.Series` with index `year`, `region` and `material`.
         """
-        # materials
+        if sink is None:
+            return self.report_materials_cube(jobs).to_series()
+
+        bioflows, names = self._material_flow_names()
+        materials = sorted(set(names))
+        positions = [materials.index(name) for name in names]
+
+        def convert(result):
+            rows = {}
+            for (year, region), values in result.items():
+                # flows of the same material are summed up
+                totals = np.bincount(positions, weights=values,
+                                     minlength=len(materials)) * 1e9  # kg
+                for material, total in zip(materials, totals):
+                    rows[(year, region, material)] = total
+            return rows
+
+        start = time.time()
+        self._series("_material_flows", (bioflows,), jobs, sink,
+                     "report_materials", ["year", "region", "material"],
+                     convert)
+        print("Calculation took {} seconds.".format(time.time() - start))
+
+    def _material_flow_names(self):
+        """
+        Return the bioflows of the material report and the material
+        name of each flow.
+        """
         bioflows = self._get_material_bioflows_for_bev()
+        names = self._names(bioflows)
+        return bioflows, [names[code].split(",")[0] for code in bioflows]
 
-        df = self.data[self.data.Variable.isin(self.variables)]
+    @profiled
+    def report_materials_cube(self, jobs=None):
+        """
+        Report the material demand of the LDV fleet for all regions and years.
+        Flows of the same material (e.g., different ore grades) are summed up.
 
-        df.set_index(["Year", "Region", "Variable"], inplace=True)
+        :param jobs: number of worker processes, defaults to `self.jobs`.
+        :type jobs: int
+        :return: an array in kg with dimensions `year`, `region` and `material`.
+        :rtype: xarray.DataArray
+        """
+        # materials
+        bioflows, names = self._material_flow_names()
 
         start = time.time()
-        result = {}
-        # calc score
-        for year in self.years:
-            db = bw.Database(eidb_label(self.model, self.scenario, year))
-            for region in self.regions:
-                # create large lca demand object
-                demand = [
-                    self._act_from_variable(
-                        var, db, year, region,
-                        scale=df.loc[(year, region, var), "value"])
-                    for var in (df.loc[(year, region)]
-                                .index.get_level_values(0)
-                                .unique())]
-                # flatten dictionaries
-                demand_flat = {}
-                for item in demand:
-                    for act, val in item.items():
-                        demand_flat[act] = val + demand_flat.get(act, 0)
-
-                lca = bw.LCA(demand_flat)
-                # build inventories
-                lca.lci()
-                for code in bioflows:
-                    result[(
-                        year, region,
-                        bw.get_activity(code)["name"].split(",")[0]
-                    )] = (
-                        lca.inventory.sum(axis=1)[
-                            lca.biosphere_dict[code], 0]
-                    )
-        df_result = pd.Series(result)
+        result = self._map_years("_material_flows", (bioflows,), jobs=jobs)
+        cube = xr.DataArray(
+            np.array([[result[(year, region)] for region in self.regions]
+                      for year in self.years]).reshape(
+                len(self.years), len(self.regions), len(bioflows)),
+            coords={
+                "year": list(self.years),
+                "region": list(self.regions),
+                "material": names
+            },
+            dims=["year", "region", "material"])
+        cube = cube.groupby("material").sum()
         print("Calculation took {} seconds.".format(time.time() - start))
-        return df_result * 1e9  # kg
+        return cube * 1e9  # kg
 
-    def report_direct_emissions(self):
+    def _material_flows(self, year, bioflows):
         """
-        Report the direct (exhaust) emissions of the LDV fleet.
+        Calculate the fleet material demand of all regions for a single year
+        from the unit inventories of the vehicle activities.
         """
+        db = eidb_label(self.model, self.scenario, year)
+        levels = self._fleet_levels(year)
+        totals = self._fleet_totals(levels, self.intensities.flows(
+            db, list(levels.key.unique()), bioflows, self._engine()))
+        return {(year, region): totals.loc[region].values
+                for region in self.regions}
+
+    @profiled
+    def report_direct_emissions(self, jobs=None, sink=None):
+        """
+        Report the direct (exhaust) emissions of the LDV fleet.
 
-        df = self.data[self.data.Variable.isin(self.variables)]
-
-        df.set_index(["Year", "Region", "Variable"], inplace=True)
-
+        :param jobs: number of worker processes, defaults to `self.jobs`.
+        :type jobs: int
+        :param sink: write the results of each year to a result sink
+            instead of returning them, see :class:`lca2rmnd.sink.ResultSink`.
+        :type sink: lca2rmnd.sink.ResultSink
+        :return: A `pandas.Series` in kg with index `year`, `region`
+            and `flow`.
+        """
         start = time.time()
-        result = {}
-        # calc score
-        for year in self.years:
-            db = bw.Database(eidb_label(self.model, self.scenario, year))
-            for region in self.regions:
-                for var in (df.loc[(year, region)]
-                            .index.get_level_values(0)
-                            .unique()):
-                    for act, share in self._act_from_variable(
-                            var, db, year, region).items():
-                        for ex in act.biosphere():
-                            result[(year, region, ex["name"])] = (
-                                result.get((year, region, ex["name"]), 0)
-                                + ex["amount"] * share * df.loc[(year, region, var), "value"])
-
-        df_result = pd.Series(result)
+        df_result = self._series(
+            "_direct_emissions", (), jobs, sink, "report_direct_emissions",
+            ["year", "region", "flow"],
+            lambda result: {key: value * 1e9  # kg
+                            for key, value in result.items()})
         print("Calculation took {} seconds.".format(time.time() - start))
-        return df_result * 1e9  # kg
+        return df_result
+
+    def _direct_emissions(self, year):
+        """
+        Sum up the direct emissions of the fleet in all regions
+        for a single year.
+        """
+        db = bw.Database(eidb_label(self.model, self.scenario, year))
+        # activity levels of the vehicle activities
+        levels = self._fleet_levels(year)
+        levels["code"] = [key[1] for key in levels.key]
+
+        flows = levels.merge(
+            self._biosphere_exchanges(db, levels.code.unique()), on="code")
+        flows["amount"] *= flows["level"]
+        result = flows.groupby(["Region", "name"])["amount"].sum()
+        return {(year, region, name): amount
+                for (region, name), amount in result.items()}
+
+    def _biosphere_exchanges(self, db, codes):
+        """
+        Load the biosphere exchanges of the activities with
+        the given `codes` in `db` with a single query.
 
-    def report_endpoint(self):
+        :return: a dataframe with the columns `code` (of the consuming
+            activity), `name` (of the flow) and `amount`.
+        :rtype: pandas.DataFrame
+        """
+        query = Exc.select(Exc.output_code, Exc.data).where(
+            (Exc.output_database == db.name)
+            & (Exc.output_code.in_(list(codes)))
+            & (Exc.type == "biosphere"))
+        return pd.DataFrame(
+            [(ex.output_code, ex.data["name"], ex.data["amount"])
+             for ex in query],
+            columns=["code", "name", "amount"])
+
+    def _fleet_scores(self, year, methods):
+        """
+        Calculate the scores of the full LDV fleet of all regions
+        for a single year from the unit scores of the vehicle activities,
+        see :class:`lca2rmnd.intensity.IntensityStore`.
+        """
+        db = eidb_label(self.model, self.scenario, year)
+        levels = self._fleet_levels(year)
+        totals = self._fleet_totals(levels, self.intensities.scores(
+            db, list(levels.key.unique()), methods, self._engine()))
+        return {(year, region, method): totals.at[region, m]
+                for region in self.regions
+                for m, method in enumerate(methods)}
+
+    @profiled
+    def report_endpoint(self, jobs=None, sink=None):
         """
         *DEPRECATED*
         Report the surplus extraction costs for the scenario.
 
+        :param jobs: number of worker processes, defaults to `self.jobs`.
+        :type jobs: int
+        :param sink: write the results of each year to a result sink
+            instead of returning them, see :class:`lca2rmnd.sink.ResultSink`.
+        :type sink: lca2rmnd.sink.ResultSink
         :return: A `pandas.Series` containing extraction costs
           with index `year` and `region`.
         """
@@ -318,132 +969,70 @@ class TransportLCAReporting(LCAReporting):
         endpoint_methods = [m for m in bw.methods if m[0] == indicatorgroup
                    and m[2] == "total"
                    and not m[1] == "total"]
+        endpoint_stack = MethodStack(endpoint_methods)
 
-        df = self.data[self.data.Variable.isin(self.variables)]
+        def convert(result):
+            for (year, region, method), score in result.items():
+                # 6% discount for monetary endpoint
+                factor = 1e9 * 1.06 ** (year - 2013) \
+                         if "resources" == method[1] else 1e9
+                result[(year, region, method)] = score * factor
+            return result
 
-        df.set_index(["Year", "Region", "Variable"], inplace=True)
         start = time.time()
-        result = {}
-        # calc score
-        for year in self.years:
-            db = bw.Database(eidb_label(self.model, self.scenario, year))
-            for region in self.regions:
-                # create large lca demand object
-                demand = [
-                    self._act_from_variable(
-                        var, db, year, region,
-                        scale=df.loc[(year, region, var), "value"])
-                    for var in (df.loc[(year, region)]
-                                .index.get_level_values(0)
-                                .unique())]
-                # flatten dictionaries
-                demand = {k: v for item in demand for k, v in item.items()}
-                lca = bw.LCA(demand, method=endpoint_methods[0])
-                # build inventories
-                lca.lci()
-                for method in endpoint_methods:
-                    lca.switch_method(method)
-                    lca.lcia()
-                    # 6% discount for monetary endpoint
-                    factor = 1e9 * 1.06 ** (year - 2013) \
-                             if "resources" == method[1] else 1e9
-                    result[(
-                        year, region, method
-                    )] = lca.score * factor
-
-        df_result = pd.Series(result)
+        df_result = self._series(
+            "_fleet_scores", (endpoint_stack,), jobs, sink,
+            "report_endpoint", ["year", "region", "method"], convert)
         print("Calculation took {} seconds.".format(time.time() - start))
         return df_result  # billion pkm
 
-    def report_midpoint(self):
+    @profiled
+    def report_midpoint(self, jobs=None, sink=None):
         """
         Report midpoint impacts for the full fleet for each scenario.
 
+        :param jobs: number of worker processes, defaults to `self.jobs`.
+        :type jobs: int
+        :param sink: write the results of each year to a result sink
+            instead of returning them, see :class:`lca2rmnd.sink.ResultSink`.
+        :type sink: lca2rmnd.sink.ResultSink
         :return: A `pandas.Series` containing impacts
           with index `year`,`region` and `method`.
         """
-
-        df = self.data[self.data.Variable.isin(self.variables)]
-
-        df.set_index(["Year", "Region", "Variable"], inplace=True)
         start = time.time()
-        result = {}
-        # calc score
-        for year in self.years:
-            db = bw.Database(eidb_label(self.model, self.scenario, year))
-            for region in self.regions:
-                # create large lca demand object
-                demand = [
-                    self._act_from_variable(
-                        var, db, year, region,
-                        scale=df.loc[(year, region, var), "value"])
-                    for var in (df.loc[(year, region)]
-                                .index.get_level_values(0)
-                                .unique())]
-                # flatten dictionaries
-                demand_flat = {}
-                for item in demand:
-                    for act, val in item.items():
-                        demand_flat[k] = val + demand_flat.get(k, 0)
-
-                lca = bw.LCA(demand_flat, method=self.methods[0])
-                # build inventories
-                lca.lci()
-                for method in self.methods:
-                    lca.switch_method(method)
-                    lca.lcia()
-                    factor = 1e9
-                    result[(
-                        year, region, method
-                    )] = lca.score * factor
-
-        df_result = pd.Series(result)
+        df_result = self._series(
+            "_fleet_scores", (self.method_stack,), jobs, sink,
+            "report_midpoint", ["year", "region", "method"],
+            lambda result: {key: score * 1e9
+                            for key, score in result.items()})
         print("Calculation took {} seconds.".format(time.time() - start))
         return df_result # billion pkm
 
-    def report_midpoint_to_endpoint(self):
+    @profiled
+    def report_midpoint_to_endpoint(self, jobs=None, sink=None):
         """
         *DEPRECATED*
         Report midpoint impacts for the full fleet for each scenario.
 
+        :param jobs: number of worker processes, defaults to `self.jobs`.
+        :type jobs: int
+        :param sink: write the results of each year to a result sink
+            instead of returning them, see :class:`lca2rmnd.sink.ResultSink`.
+        :type sink: lca2rmnd.sink.ResultSink
         :return: A `pandas.Series` containing impacts
           with index `year`,`region` and `method`.
         """
         methods = [m for m in bw.methods
                    if m[0] == "ReCiPe Endpoint (H,A) (obsolete)"
                    and m[2] != "total"]
+        method_stack = MethodStack(methods)
 
-        df = self.data[self.data.Variable.isin(self.variables)]
-
-        df.set_index(["Year", "Region", "Variable"], inplace=True)
         start = time.time()
-        result = {}
-        # calc score
-        for year in self.years:
-            db = bw.Database(eidb_label(self.model, self.scenario, year))
-            for region in self.regions:
-                # create large lca demand object
-                demand = [
-                    self._act_from_variable(
-                        var, db, year, region,
-                        scale=df.loc[(year, region, var), "value"])
-                    for var in (df.loc[(year, region)]
-                                .index.get_level_values(0)
-                                .unique())]
-                # flatten dictionaries
-                demand = {k: v for item in demand for k, v in item.items()}
-                lca = bw.LCA(demand, method=self.methods[0])
-                # build inventories
-                lca.lci()
-                for method in methods:
-                    lca.switch_method(method)
-                    lca.lcia()
-                    factor = 1e9
-                    result[(
-                        year, region, method
-                    )] = lca.score * factor
-
-        df_result = pd.Series(result)
+        df_result = self._series(
+            "_fleet_scores", (method_stack,), jobs, sink,
+            "report_midpoint_to_endpoint", ["year", "region", "method"],
+            lambda result: {key: score * 1e9
+                            for key, score in result.items()})
         print("Calculation took {} seconds.".format(time.time() - start))
         return df_result # billion pkm
 
@@ -467,34 +1056,61 @@ class ElectricityLCAReporting(LCAReporting):
     :vartype source_db: str
 
     """
-    def report_sectoral_LCA(self):
+
+    # low voltage consumers
+    low_voltage = [
+        "FE|Buildings|Electricity",
+        "FE|Transport|Electricity"
+    ]
+    # medium voltage consumers
+    medium_voltage = [
+        "FE|Industry|Electricity",
+        "FE|CDR|Electricity"
+    ]
+    remind_variables = low_voltage + medium_voltage
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        shared = kwargs.get("shared")
+        self.production_volumes = None
+        if shared is None:
+            # supplier share tables, keyed by database name
+            self.share_tables = {}
+            # ecoinvent locations, keyed by REMIND region
+            self.locations = {}
+        else:
+            self.share_tables = shared.share_tables
+            self.locations = shared.locations
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        names = self.__dict__.get("unit_databases", ())
+        state["share_tables"] = {
+            name: table for name, table in self.share_tables.items()
+            if name in names}
+        return state
+
+    @profiled
+    def report_sectoral_LCA(self, jobs=None):
         """
         Report sectoral averages for the electricity sector based on the (updated)
         ecoinvent electricity market groups.
 
+        :param jobs: number of worker processes, defaults to `self.jobs`.
+        :type jobs: int
         :return: a dataframe with impacts for the REMIND electricity supply
             both as regional totals and impacts per kWh.
         :rtype: pandas.DataFrame
 
         """
-        # low voltage consumers
-        low_voltage = [
-            "FE|Buildings|Electricity",
-            "FE|Transport|Electricity"
-        ]
-
         market = "market group for electricity, low voltage"
 
-        df_lowvolt = self._sum_variables_and_add_scores(market, low_voltage)
-
-        # medium voltage consumers
-        medium_voltage = [
-            "FE|Industry|Electricity",
-            "FE|CDR|Electricity"
-        ]
+        df_lowvolt = self._sum_variables_and_add_scores(
+            market, self.low_voltage, jobs)
 
         market = "market group for electricity, medium voltage"
-        df_medvolt = self._sum_variables_and_add_scores(market, medium_voltage)
+        df_medvolt = self._sum_variables_and_add_scores(
+            market, self.medium_voltage, jobs)
 
         result = pd.concat([df_lowvolt, df_medvolt])
         result["total_demand"] = result["value"]\
@@ -508,14 +1124,14 @@ class ElectricityLCAReporting(LCAReporting):
 
         return result[["Year", "Region", "method", "total_score", "score_kWh"]].drop_duplicates()
 
-    def _sum_variables_and_add_scores(self, market, variables):
+    def _sum_variables_and_add_scores(self, market, variables, jobs=None):
         """
         Sum the variables that belong to the market
         and calculate the LCA scores for all years,
         regions and methods.
         """
         df = self.data[self.data.Variable.isin(variables)]\
-                 .groupby(["Region", "Year"])\
+                 .groupby(["Region", "Year"], observed=True)[["value"]]\
                  .sum()
         df.reset_index(inplace=True)
         df["market"] = market
@@ -523,69 +1139,129 @@ class ElectricityLCAReporting(LCAReporting):
         # add methods dimension & score column
         methods_df = pd.DataFrame({"method": self.methods, "market": market})
         df = df.merge(methods_df)
-        df.loc[:, "score"] = 0.
 
         # calc score
-        for year in self.years:
-            db = bw.Database(eidb_label(self.model, self.scenario, year))
-            for region in self.regions:
-                # import ipdb;ipdb.set_trace()
-                # find activity
-                act = [a for a in db if a["name"] == market and
-                       a["location"] == region][0]
-                # create first lca object
-                lca = bw.LCA({act: 1}, method=df.method[0])
-                # build inventories
-                lca.lci()
-
-                df_slice = df[(df.Year == year) &
-                              (df.Region == region)]
-
-                def get_score(method):
-                    lca.switch_method(method)
-                    lca.lcia()
-                    return lca.score
-
-                df_slice.loc[:, "score"] = df_slice.apply(
-                    lambda row: get_score(row["method"]), axis=1)
-                df.update(df_slice)
+        result = self._map_years("_market_scores", (market,), jobs=jobs)
+        scores = np.zeros((len(self.years), len(self.regions), len(self.methods)))
+        for y, year in enumerate(self.years):
+            for r, region in enumerate(self.regions):
+                scores[y, r] = result[(year, region)]
+        scores = pd.DataFrame({"score": scores.ravel()}, index=pd.MultiIndex.from_product(
+            [list(self.years), list(self.regions), range(len(self.methods))],
+            names=["Year", "Region", "method_idx"]))
+        method_idx = {method: idx for idx, method in enumerate(self.methods)}
+        df["method_idx"] = [method_idx[method] for method in df["method"]]
+        df = df.join(scores, on=["Year", "Region", "method_idx"])\
+               .drop(columns="method_idx")
+        df["score"] = df["score"].fillna(0.)
 
         df["total_score"] = df["score"] * df["value"] * 2.8e11  # EJ -> kWh
         return df
 
-    def report_tech_LCA(self, year):
+    def _market_scores(self, year, market):
+        """
+        Calculate the scores of the electricity market
+        of all regions for a single year.
+        """
+        db = bw.Database(eidb_label(self.model, self.scenario, year))
+        engine = self._engine()
+        markets = self._activities(db, market)
+        result = {}
+        for region in self.regions:
+            with self.profiler.phase("scores", region=region):
+                result[(year, region)] = engine.scores(
+                    {markets[(market, region)]: 1}, self.method_stack,
+                    (market, region))
+        return result
+
+    def _demands(self, year):
+        """
+        Return one kWh of the low voltage electricity market
+        of all regions for a single year.
+        """
+        market = "market group for electricity, low voltage"
+        db = bw.Database(eidb_label(self.model, self.scenario, year))
+        markets = self._activities(db, market)
+        return {region: {markets[(market, region)]: 1}
+                for region in self.regions}
+
+    @profiled
+    def report_tech_LCA(self, year, jobs=None):
         """
         For each REMIND technology, find a set of activities in the region.
         Use ecoinvent tech share file to determine the shares of technologies
         within the REMIND proxies.
-        """
 
+        :param year: a single year or a list of years.
+        :type year: Union[int, list]
+        :param jobs: number of worker processes, defaults to `self.jobs`.
+        :type jobs: int
+        :return: a dataframe with a `score` column and the index `region`,
+            `tech` and `method`. For a list of years, the index has an
+            additional outer level `year`.
+        :rtype: pandas.DataFrame
+        """
+        years = year if isinstance(year, (list, tuple, np.ndarray)) else [year]
+        result = self.report_tech_LCA_cube(years, jobs).to_series()\
+                     .to_frame("score")
+        if years is year:
+            return result
+        return result.loc[year]
+
+    @profiled
+    def report_tech_LCA_cube(self, years, jobs=None):
+        """
+        Calculate the scores of all REMIND technologies in all regions.
+        The demands of all technologies in a year database are solved
+        at once, see :meth:`lca2rmnd.engine.LCAEngine.scores_many`.
+
+        :param years: list of years.
+        :type years: list
+        :param jobs: number of worker processes, defaults to `self.jobs`.
+        :type jobs: int
+        :return: an array with dimensions `year`, `region`, `tech` and
+            `method`. Technologies without activities are `NaN`.
+        :rtype: xarray.DataArray
+        """
         tecf = pd.read_csv(DATA_DIR/"powertechs.csv", index_col="tech")
         tecdict = tecf.to_dict()["mif_entry"]
 
-        db = bw.Database("_".join(["ecoinvent", self.scenario, str(year)]))
-
-        result = self._cartesian_product({
-            "region": self.regions,
-            "tech": list(tecdict.keys()),
-            "method": self.methods
-        }).sort_index()
+        result = self._map_years("_tech_scores", jobs=jobs, years=years)
+        techs = sorted(set(tecdict) | {tech for _, _, tech in result})
+        cube = np.full((len(years), len(self.regions), len(techs),
+                        len(self.methods)), np.nan)
+        for y, year in enumerate(years):
+            for r, region in enumerate(self.regions):
+                for t, tech in enumerate(techs):
+                    if (year, region, tech) in result:
+                        cube[y, r, t] = result[(year, region, tech)]
+        return xr.DataArray(
+            cube,
+            coords={
+                "year": list(years),
+                "region": list(self.regions),
+                "tech": techs,
+                "method": pd.Index(self.methods, tupleize_cols=False)
+            },
+            dims=["year", "region", "tech", "method"])
 
+    def _tech_scores(self, year):
+        """
+        Calculate the scores of all technologies in all regions
+        for a single year.
+        """
+        db = bw.Database("_".join(["ecoinvent", self.scenario, str(year)]))
+        labels, demands = [], []
         for region in self.regions:
             # read the ecoinvent techs for the entries
-            shares = self.supplier_shares(db, region)
-
-            for tech, acts in shares.items():
-                # calc LCA
-                lca = bw.LCA(acts, self.methods[0])
-                lca.lci()
-
-                for method in self.methods:
-                    lca.switch_method(method)
-                    lca.lcia()
-                    result.at[(region, tech, method), "score"] = lca.score
-
-        return result
+            for tech, acts in self._supplier_keys(db, region).items():
+                labels.append((year, region, tech))
+                demands.append(acts)
+        if not demands:
+            return {}
+        scores = self._engine().scores_many(
+            demands, self.method_stack, [label[1:] for label in labels])
+        return dict(zip(labels, scores))
 
     def _cartesian_product(self, idx):
         """
@@ -602,28 +1278,103 @@ class ElectricityLCAReporting(LCAReporting):
         index = pd.MultiIndex.from_product(idx.values(), names=idx.keys())
         return pd.DataFrame(index=index)
 
-    def _find_suppliers(self, db, expr, locs):
+    def _production_volumes(self):
         """
-        Return a list of supplier activites in locations `locs` matching
-        the peewee expression `expr` within `db`.
+        Return the production volumes of the ecoinvent electricity
+        datasets, keyed by dataset name and location.
         """
-        assert type(locs) == list
-        sel = self.selector.select(db, expr, locs)
-        if sel.count() == 0:
-            locs = ["RER"]
-        sel = self.selector.select(db, expr, locs)
-        if sel.count() == 0:
-            locs = ["RoW"]
-        sel = self.selector.select(db, expr, locs)
-        if sel.count == 0:
-            raise ValueError("No activity found for expression.")
+        if self.production_volumes is None:
+            vols = pd.read_csv(
+                DATA_DIR/"electricity_production_volumes_per_tech.csv",
+                sep=";")
+            self.production_volumes = vols\
+                .groupby(["dataset", "location"])["Sum of production volume"]\
+                .first().to_dict()
+        return self.production_volumes
+
+    def _ecoinvent_locations(self, region):
+        """
+        Return the ecoinvent locations within a REMIND region.
+        """
+        if region not in self.locations:
+            self.locations[region] = \
+                self.geo.remind_to_ecoinvent_location(region)
+        return self.locations[region]
+
+    def supplier_share_table(self, db, regions=None):
+        """
+        Find the ecoinvent activities for all REMIND regions and
+        technologies, and the associated shares of production volume.
 
-        return [Activity(a) for a in sel]
+        The activities are selected in memory, see
+        :class:`lca2rmnd.activity_select.ActivityTable`. If no activity
+        is found within a region, the RER and then the RoW activities
+        are used. The table is computed once per database and region.
+
+        :param db: a brightway2 database
+        :type db: brightway2.Database
+        :param regions: the regions to include, defaults to `self.regions`.
+            Regions which are not in the table yet are added to it.
+        :type regions: list
+        :return: a dataframe with the columns `region`, `tech`, `key`
+            (of the activity) and `share`.
+        :rtype: pandas.DataFrame
+        """
+        regions = list(self.regions if regions is None else regions)
+        table = self.share_tables.get(db.name)
+        done = set() if table is None else set(table.region)
+        missing = [region for region in regions if region not in done]
+        if missing:
+            part = self._share_rows(db, missing)
+            table = part if table is None else pd.concat(
+                [table, part], ignore_index=True)
+            self.share_tables[db.name] = table
+        return table[table.region.isin(regions)]
+
+    def _share_rows(self, db, regions):
+        """
+        Compute the rows of :meth:`supplier_share_table` for `regions`.
+        """
+        vols = self._production_volumes()
+        table = self.selector.table(db)
+
+        # the filters come from the premise package
+        # this package is also used to modify the techs in the first place
+        fltrs = InventorySet(db).powerplant_filters
+        rows = []
+        for tech, tech_fltr in fltrs.items():
+            candidates = table.df[table.mask(**tech_fltr)]
+            for region in regions:
+                for locs in [self._ecoinvent_locations(region),
+                             ["RER"], ["RoW"]]:
+                    acts = candidates[candidates.location.isin(locs)]
+                    if len(acts) > 0:
+                        break
+                else:
+                    raise ValueError(
+                        "No activity found for {} in {}.".format(tech, region))
+
+                shares = np.array([
+                    vols.get((name, loc), 0.)
+                    for name, loc in zip(acts["name"], acts["location"])])
+                if len(acts) == 1:
+                    shares = np.ones(1)
+                elif shares.sum() == 0:
+                    shares = np.full(len(acts), 1./len(acts))
+                else:
+                    shares = shares / shares.sum()
+                rows.extend(
+                    (region, tech, (database, code), share)
+                    for database, code, share
+                    in zip(acts.database, acts.code, shares))
+
+        return pd.DataFrame(rows, columns=["region", "tech", "key", "share"])
 
     def supplier_shares(self, db, region):
         """
         Find the ecoinvent activities for a
         REMIND region and the associated share of production volume.
+        The values are read from :meth:`supplier_share_table`.
 
         :param db: a brightway2 database
         :type db: brightway2.Database
@@ -637,37 +1388,91 @@ class ElectricityLCAReporting(LCAReporting):
             }
         :rtype: dict
         """
+        key_shares = self._supplier_keys(db, region)
+        keys = {key for shares in key_shares.values() for key in shares}
+        acts = {
+            (act.database, act.code): Activity(act)
+            for act in Act.select().where(
+                (Act.database == db.name)
+                & Act.code.in_([code for _, code in keys]))
+        }
+        return {tech: {acts[key]: share for key, share in shares.items()}
+                for tech, shares in key_shares.items()}
 
-        # ecoinvent locations within REMIND region
-        locs = self.geo.remind_to_ecoinvent_location(region)
-        # ecoinvent activities
+    def _supplier_keys(self, db, region):
+        """
+        Return the shares of :meth:`supplier_shares`,
+        keyed by activity keys instead of activities.
+        """
+        table = self.supplier_share_table(db, [region])
+        key_shares = {}
+        for tech, key, share in zip(table.tech, table.key, table.share):
+            key_shares.setdefault(tech, {})[key] = share
+        return key_shares
 
-        vols = pd.read_csv(DATA_DIR/"electricity_production_volumes_per_tech.csv",
-                           sep=";", index_col=["dataset", "location"])
 
-        # the filters come from the premise package
-        # this package is also used to modify the techs in the first place
-        fltrs = InventorySet(db).powerplant_filters
-        act_shares = {}
-        for tech, tech_fltr in fltrs.items():
-            expr = self.selector.create_expr(**tech_fltr)
-            acts = self._find_suppliers(db, expr, locs)
-
-            # more than one, check shares
-            if len(acts) > 1:
-                shares = {}
-                for act in acts:
-                    lookup = vols.index.isin([(act["name"], act["location"])])
-                    if any(lookup):
-                        shares[act] = vols.loc[lookup, "Sum of production volume"].iat[0]
-                    else:
-                        shares[act] = 0.
-                tot = sum(shares.values())
-                if tot == 0:
-                    act_shares[tech] = {act: 1./len(acts) for act in acts}
-                else:
-                    act_shares[tech] = {act: shares[act]/tot for act in acts}
+class MultiScenarioReporting():
+    """
+    Run the reports of an LCA reporting class for several REMIND scenarios.
 
-            else:
-                act_shares[tech] = {acts[0]: 1}
-        return act_shares
+    The reporting objects of all scenarios share their method stack,
+    geomatcher, activity indices and score cache. With `jobs` > 1, the
+    year databases of all scenarios are scheduled together on a single
+    process pool.
+
+    :ivar reports: reporting objects, keyed by scenario.
+    :vartype reports: dict
+    :ivar jobs: number of worker processes.
+    :vartype jobs: int
+    """
+    def __init__(self, reporting_class, scenarios, years, project,
+                 remind_output_folder, methods, regions=None,
+                 jobs=1, cache=None, solver="direct", tol=1e-8,
+                 profiler=None):
+        self.jobs = jobs
+        self.reports = {}
+        shared = None
+        for scenario in scenarios:
+            self.reports[scenario] = reporting_class(
+                scenario, years, project, remind_output_folder, methods,
+                regions=regions, jobs=jobs, cache=cache, shared=shared,
+                solver=solver, tol=tol, profiler=profiler)
+            shared = shared or self.reports[scenario]
+
+    def report(self, name, *args, **kwargs):
+        """
+        Call the report method `name` for all scenarios.
+
+        :param name: name of the report method, e.g., `report_LDV_LCA`.
+        :type name: str
+        :return: the results of all scenarios, concatenated along
+            an additional outer index level (or array dimension) `Scenario`,
+            `None` if the results are written to a result sink.
+        :rtype: Union[pandas.DataFrame, pandas.Series, xarray.DataArray]
+        """
+        scenarios = list(self.reports)
+        if self.jobs is None or self.jobs <= 1:
+            results = [getattr(self.reports[scenario], name)(*args, **kwargs)
+                       for scenario in scenarios]
+        else:
+            # the report methods run in threads and submit
+            # their year databases to the same pool
+            with process_pool(self.jobs) as pool:
+                for rep in self.reports.values():
+                    rep.pool = pool
+                try:
+                    with ThreadPoolExecutor(len(scenarios)) as threads:
+                        results = list(threads.map(
+                            lambda scenario: getattr(
+                                self.reports[scenario], name)(*args, **kwargs),
+                            scenarios))
+                finally:
+                    for rep in self.reports.values():
+                        rep.pool = None
+
+        if results[0] is None:
+            # written to a result sink
+            return None
+        if isinstance(results[0], xr.DataArray):
+            return xr.concat(results, dim=pd.Index(scenarios, name="Scenario"))
+        return pd.concat(results, keys=scenarios, names=["Scenario"])
@@ -0,0 +1,176 @@
+from pathlib import Path
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+
+class ResultSink():
+    """
+    Write the results of report methods to a Parquet dataset while they
+    are calculated, one year at a time, instead of keeping them in memory.
+
+    The results of a report are stored in the folder
+    `<directory>/<report>/scenario=<scenario>/year=<year>`, one file per
+    call to :meth:`write`. Each file has an integer code column per
+    dimension (other than the year) and a `value` column. The labels of
+    the codes, e.g., regions or method tuples, are stored as JSON in the
+    metadata of the file. Files are written to a temporary name and then
+    renamed, so a crash leaves only complete years behind.
+
+    Use :meth:`read` to get the results in the shape returned by the
+    report methods.
+
+    :ivar directory: root folder of the dataset.
+    :vartype directory: pathlib.Path
+    """
+    def __init__(self, directory):
+        if pq is None:
+            raise ImportError("The result sink requires pyarrow.")
+        self.directory = Path(directory)
+
+    def _folder(self, report, scenario, year=None):
+        folder = self.directory / report / "scenario={}".format(scenario)
+        if year is not None:
+            folder = folder / "year={}".format(year)
+        return folder
+
+    def clear(self, report, scenario):
+        """
+        Remove the results of `report` for `scenario`.
+        """
+        folder = self._folder(report, scenario)
+        if folder.exists():
+            shutil.rmtree(folder)
+
+    def write(self, report, scenario, dims, result):
+        """
+        Write results of `report`.
+
+        :param report: name of the report, e.g., "report_midpoint".
+        :type report: str
+        :param scenario: name of the REMIND scenario.
+        :type scenario: str
+        :param dims: names of the dimensions of the result keys,
+            starting with "year".
+        :type dims: list
+        :param result: values keyed by tuples of labels, one per dimension.
+        :type result: dict
+        """
+        by_year = {}
+        for key, value in result.items():
+            by_year.setdefault(key[0], []).append((key[1:], value))
+
+        for year, items in by_year.items():
+            columns, labels = {}, {}
+            for d, dim in enumerate(dims[1:]):
+                codes, uniques = pd.factorize(
+                    pd.Index([key[d] for key, _ in items],
+                             tupleize_cols=False))
+                columns[dim] = pa.array(
+                    codes.astype(np.int32), type=pa.int32())
+                labels[dim] = [_plain(label) for label in uniques]
+            columns["value"] = pa.array(
+                [value for _, value in items], type=pa.float64())
+            table = pa.table(columns).replace_schema_metadata({
+                "lca2rmnd": json.dumps({"dims": list(dims),
+                                        "labels": labels})})
+
+            folder = self._folder(report, scenario, year)
+            folder.mkdir(parents=True, exist_ok=True)
+            path = folder / "part-{:05d}.parquet".format(
+                len(list(folder.glob("part-*.parquet"))))
+            tmp_path = path.with_name(path.name + ".tmp")
+            pq.write_table(table, tmp_path)
+            os.replace(tmp_path, path)
+
+    def scenarios(self, report):
+        """
+        Return the scenarios with results of `report`.
+
+        :rtype: list
+        """
+        return sorted(path.name.split("=", 1)[1] for path
+                      in (self.directory / report).glob("scenario=*"))
+
+    def read(self, report, scenario=None, years=None):
+        """
+        Read the results of `report`.
+
+        :param report: name of the report, e.g., "report_midpoint".
+        :type report: str
+        :param scenario: name of the REMIND scenario. Defaults to all
+            scenarios, with an additional outer index level `Scenario`,
+            as returned by :class:`lca2rmnd.reporting.MultiScenarioReporting`.
+        :type scenario: str
+        :param years: years to read, defaults to all years.
+        :type years: list
+        :return: the results with one index level per dimension
+        :rtype: pandas.Series
+        """
+        if scenario is None:
+            scenarios = self.scenarios(report)
+            return pd.concat([self.read(report, scen, years)
+                              for scen in scenarios],
+                             keys=scenarios, names=["Scenario"])
+
+        folders = sorted(
+            self._folder(report, scenario).glob("year=*"),
+            key=lambda folder: int(folder.name.split("=", 1)[1]))
+        dims, levels, codes, values = None, None, None, []
+        for folder in folders:
+            year = int(folder.name.split("=", 1)[1])
+            if years is not None and year not in years:
+                continue
+            for path in sorted(folder.glob("part-*.parquet")):
+                table = pq.read_table(path)
+                meta = json.loads(table.schema.metadata[b"lca2rmnd"])
+                if dims is None:
+                    dims = meta["dims"]
+                    levels = {dim: {} for dim in dims}
+                    codes = {dim: [] for dim in dims}
+                codes["year"].append(np.full(
+                    table.num_rows, levels["year"].setdefault(
+                        year, len(levels["year"]))))
+                for dim in dims[1:]:
+                    # map the codes of the file to codes of all files
+                    mapping = np.array([
+                        levels[dim].setdefault(
+                            _label(label), len(levels[dim]))
+                        for label in meta["labels"][dim]], dtype=np.int64)
+                    codes[dim].append(mapping[
+                        table.column(dim).to_numpy().astype(np.int64)])
+                values.append(table.column("value").to_numpy())
+
+        if dims is None:
+            return pd.Series(dtype=float)
+        index = pd.MultiIndex(
+            levels=[pd.Index(list(levels[dim]), tupleize_cols=False)
+                    for dim in dims],
+            codes=[np.concatenate(codes[dim]) for dim in dims],
+            names=dims)
+        return pd.Series(np.concatenate(values), index=index)
+
+
+def _plain(label):
+    """Turn a label into a JSON serializable value."""
+    if isinstance(label, tuple):
+        return [_plain(item) for item in label]
+    if isinstance(label, np.generic):
+        return label.item()
+    return label
+
+
+def _label(value):
+    """Turn a label read from JSON back into a hashable value."""
+    if isinstance(value, list):
+        return tuple(_label(item) for item in value)
+    return value
@@ -0,0 +1,27 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def synthetic_project(tmp_path_factory):
+    """
+    A small synthetic brightway2 project with the scenarios BAU and SCP26,
+    see `benchmarks/synthetic.py`.
+
+    :return: the project name, the folder of the REMIND output files,
+        the years and the midpoint methods
+    :rtype: tuple
+    """
+    pytest.importorskip("premise")
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent
+                           / "benchmarks"))
+    from synthetic import create_project
+
+    project = "lca2rmnd_tests"
+    folder = tmp_path_factory.mktemp("remind")
+    years = [2020, 2030]
+    methods = create_project(project, folder, ["BAU", "SCP26"], years,
+                             size=50, n_midpoints=3)
+    return project, folder, years, methods
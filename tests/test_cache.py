@@ -0,0 +1,78 @@
+import brightway2 as bw
+
+from concurrent.futures import ThreadPoolExecutor
+
+from lca2rmnd.cache import ScoreCache
+
+
+def test_get_and_set(tmp_path):
+    cache = ScoreCache(tmp_path / "scores.sqlite")
+    cache.set(["a", "b"], [1., 2.], "db")
+
+    assert cache.get(["a", "c", "b"]) == [1., None, 2.]
+    assert len(cache) == 2
+
+
+def test_eviction(tmp_path):
+    cache = ScoreCache(tmp_path / "scores.sqlite", max_entries=2)
+    cache.set(["a"], [1.], "db")
+    cache.set(["b"], [2.], "db")
+    cache.set(["c"], [3.], "db")
+
+    assert len(cache) == 2
+    assert cache.get(["a"]) == [None]
+
+
+def test_invalidate(tmp_path):
+    cache = ScoreCache(tmp_path / "scores.sqlite")
+    cache.set(["a"], [1.], "db_2030")
+    cache.set(["b"], [2.], "db_2050")
+    cache.invalidate("db_2030")
+
+    assert cache.get(["a", "b"]) == [None, 2.]
+
+
+def test_invalidate_all_databases(tmp_path):
+    cache = ScoreCache(tmp_path / "scores.sqlite")
+    demand = {("db_2050", "a"): 1, ("db_2030", "b"): 1}
+    cache.set(["a"], [1.], cache.database(demand))
+    cache.set(["b"], [2.], "db_2050")
+    cache.invalidate("db_2030")
+
+    assert cache.get(["a", "b"]) == [None, 2.]
+
+
+def test_eviction_after_reopening(tmp_path):
+    cache = ScoreCache(tmp_path / "scores.sqlite", max_entries=2)
+    cache.set(["a", "b"], [1., 2.], "db")
+    cache.set(["a"], [3.], "db")
+    cache = ScoreCache(tmp_path / "scores.sqlite", max_entries=2)
+    cache.set(["c"], [3.], "db")
+
+    assert len(cache) == 2
+    assert cache.get(["b"]) == [None]
+
+
+def test_flow_keys(tmp_path):
+    cache = ScoreCache(tmp_path / "scores.sqlite")
+    methods = len(bw.methods)
+    keys = cache.flow_keys({("db", "a"): 1}, [("biosphere3", "x"),
+                                             ("biosphere3", "y")])
+
+    assert len(set(keys)) == 2
+    assert len(bw.methods) == methods
+
+
+def test_threads(tmp_path):
+    cache = ScoreCache(tmp_path / "scores.sqlite")
+    cache.set(["a"], [1.], "db")
+
+    def store(key):
+        cache.set([key], [2.], "db")
+        return cache.get(["a", key])
+
+    with ThreadPoolExecutor(2) as threads:
+        found = list(threads.map(store, ["b", "c"]))
+
+    assert found == [[1., 2.], [1., 2.]]
+    assert len(cache) == 3
@@ -3,10 +3,56 @@ import pandas as pd
 
 from lca2rmnd.data_collection import RemindDataCollection
 
-rdc = RemindDataCollection("BAU")
 
 def test_load_data():
+    rdc = RemindDataCollection("BAU")
     assert type(rdc.data) is pd.DataFrame
     assert set(["Region", "Variable", "Unit", "Year"]).issubset(rdc.data.columns)
     assert len(rdc.data)
     
+
+def test_parquet_cache(tmp_path):
+    with open(tmp_path / "remind_test.mif", "w") as mif:
+        mif.write("Model;Scenario;Region;Variable;Unit;2005;2010;\n"
+                  "REMIND;test;EUR;FE|Transport|Electricity;EJ/yr;1;2;\n"
+                  "REMIND;test;USA;FE|Transport|Electricity;EJ/yr;3;4;\n")
+    data = RemindDataCollection("test", tmp_path).data
+
+    assert (tmp_path / "remind_test.mif.parquet").exists()
+    assert isinstance(data.Region.dtype, pd.CategoricalDtype)
+
+    cached = RemindDataCollection("test", tmp_path).data
+    pd.testing.assert_frame_equal(data, cached)
+
+
+def test_selectors(tmp_path):
+    with open(tmp_path / "remind_test.mif", "w") as mif:
+        mif.write("Model;Scenario;Region;Variable;Unit;2005;2010;\n"
+                  "REMIND;test;EUR;FE|Transport|Electricity;EJ/yr;1;2;\n"
+                  "REMIND;test;EUR;ES|Transport|VKM|Pass;bn vkm/yr;5;6;\n"
+                  "REMIND;test;USA;ES|Transport|VKM|Pass;bn vkm/yr;3;4;\n")
+    for _ in range(2):
+        # parse the .mif first, then read from the cache
+        data = RemindDataCollection(
+            "test", tmp_path, variables=["ES|Transport|"],
+            regions=["EUR"], years=[2010]).data
+
+        assert len(data) == 1
+        assert data.value.iat[0] == 6
+
+
+def test_cached_selectors(tmp_path):
+    with open(tmp_path / "remind_test.mif", "w") as mif:
+        mif.write("Model;Scenario;Region;Variable;Unit;2005;2010;\n"
+                  "REMIND;test;EUR;FE|Transport|Electricity;EJ/yr;1;2;\n"
+                  "REMIND;test;EUR;FE|Transport|Liquids;EJ/yr;7;8;\n"
+                  "REMIND;test;EUR;ES|Transport|VKM|Pass;bn vkm/yr;5;6;\n"
+                  "REMIND;test;USA;ES|Transport|VKM|Pass;bn vkm/yr;3;4;\n")
+    selectors = {"variables": ["FE|Transport|Electricity", "ES|Transport|"],
+                 "regions": ["EUR"]}
+    parsed = RemindDataCollection("test", tmp_path, **selectors).data
+    cached = RemindDataCollection("test", tmp_path, **selectors).data
+
+    pd.testing.assert_frame_equal(parsed, cached)
+    assert sorted(cached.Variable.unique()) == [
+        "ES|Transport|VKM|Pass", "FE|Transport|Electricity"]
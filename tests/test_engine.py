@@ -0,0 +1,72 @@
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import splu
+
+from lca2rmnd.engine import IterativeSolver, _preconditioner, top
+
+
+def technosphere(n, scale=1., seed=0):
+    rng = np.random.default_rng(seed)
+    matrix = sparse.random(n, n, density=0.05, random_state=seed) * -0.1
+    matrix = matrix.tolil()
+    matrix[:5] *= scale
+    matrix.setdiag(1.)
+    return matrix.tocsc(), rng.uniform(size=n)
+
+
+def test_preconditioned_solve():
+    previous, _ = technosphere(100)
+    matrix, rhs = technosphere(100, scale=1.2)
+
+    solver = IterativeSolver(matrix, splu(previous))
+    assert np.allclose(solver.solve(rhs), splu(matrix).solve(rhs))
+    assert not solver.fallback
+
+
+def test_permuted_preconditioner():
+    previous, _ = technosphere(100)
+    matrix, rhs = technosphere(100, scale=1.2)
+    perm = np.random.default_rng(1).permutation(100)
+    # row/column i of the permuted matrix is row/column perm[i] of `matrix`
+    permuted = matrix[perm][:, perm]
+
+    solver = IterativeSolver(permuted, splu(previous), perm, perm)
+    assert np.allclose(solver.solve(rhs[perm]),
+                       splu(matrix).solve(rhs)[perm])
+    assert not solver.fallback
+
+
+def test_chained_permutations():
+    first, _ = technosphere(100)
+    matrix, rhs = technosphere(100, scale=1.1)
+    rng = np.random.default_rng(2)
+    # each year permutes the order of the previous year
+    perm_second, perm_third = rng.permutation(100), rng.permutation(100)
+    second = matrix[perm_second][:, perm_second]
+    solver = IterativeSolver(second, splu(first), perm_second, perm_second)
+
+    third = second[perm_third][:, perm_third]
+    lu, rows, cols = _preconditioner(solver, perm_third, perm_third)
+    chained = IterativeSolver(third, lu, rows, cols, maxiter=3)
+    rhs = rhs[perm_second][perm_third]
+    assert np.allclose(chained.solve(rhs), splu(third.tocsc()).solve(rhs))
+    assert not chained.fallback
+
+
+def test_fallback():
+    previous, _ = technosphere(100)
+    matrix, rhs = technosphere(100, scale=1.2)
+
+    solver = IterativeSolver(matrix, splu(previous), tol=1e-30, maxiter=1)
+    assert np.allclose(solver.solve(rhs), splu(matrix).solve(rhs))
+    assert solver.fallback
+
+
+def test_top():
+    matrix = np.array([[1., -5., 3., 0.],
+                       [2., 0., -1., 4.]])
+    idx, values = top(matrix, 2)
+
+    assert idx.tolist() == [[1, 2], [3, 0]]
+    assert values.tolist() == [[-5., 3.], [4., 2.]]
+    assert top(matrix, 10)[0].shape == (2, 4)
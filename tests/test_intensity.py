@@ -0,0 +1,87 @@
+import brightway2 as bw
+import numpy as np
+
+from lca2rmnd.cache import ScoreCache
+from lca2rmnd.engine import LCAEngine
+from lca2rmnd.intensity import IntensityStore
+
+
+class CountingEngine(LCAEngine):
+    """Engine recording the activities it solves for."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.solved = []
+
+    def biosphere_many(self, demands, labels=None):
+        self.solved.append(labels)
+        return super().biosphere_many(demands, labels)
+
+
+def write_project():
+    bw.projects.set_current("lca2rmnd_test_intensity")
+    bw.Database("biosphere").write({
+        ("biosphere", flow): {"name": flow, "unit": "kilogram",
+                              "type": "emission"}
+        for flow in ["co2", "ch4"]})
+    bw.Database("db").write({
+        ("db", code): {
+            "name": code, "location": "GLO", "unit": "kilogram",
+            "exchanges": [
+                {"input": ("db", code), "amount": 1., "type": "production"},
+                {"input": ("db", "a"), "amount": amount,
+                 "type": "technosphere"},
+                {"input": ("biosphere", "co2"), "amount": 2.,
+                 "type": "biosphere"},
+                {"input": ("biosphere", "ch4"), "amount": amount,
+                 "type": "biosphere"}]}
+        for code, amount in [("a", 0.1), ("b", 0.5), ("c", 0.2)]})
+    methods = [("lca2rmnd test", "climate"), ("lca2rmnd test", "methane")]
+    for method, factors in zip(methods, [[1., 25.], [0., 1.]]):
+        bw.Method(method).register()
+        bw.Method(method).write([
+            (("biosphere", flow), factor)
+            for flow, factor in zip(["co2", "ch4"], factors)])
+    return methods
+
+
+def test_unit_results_once():
+    methods = write_project()
+    a, b, c = ("db", "a"), ("db", "b"), ("db", "c")
+    store = IntensityStore()
+    engine = CountingEngine()
+
+    scores = store.scores("db", [a, b], methods, engine)
+    assert engine.solved == [[a, b]]
+    assert np.allclose(scores, [LCAEngine().scores({key: 1}, methods)
+                                for key in [a, b]])
+
+    # known activities, in any order
+    assert np.allclose(store.scores("db", [b, a, b], methods, engine),
+                       scores[[1, 0, 1]])
+    assert engine.solved == [[a, b]]
+
+    # only new activities are solved
+    store.scores("db", [a, c], methods, engine)
+    assert engine.solved == [[a, b], [c]]
+
+    # other columns and kinds are calculated once as well
+    store.scores("db", [a], methods[:1], engine)
+    store.flows("db", [a, b], [("biosphere", "co2")], engine)
+    store.flows("db", [b, a], [("biosphere", "co2")], engine)
+    assert engine.solved == [[a, b], [c], [a], [a, b]]
+
+
+def test_cached_unit_results(tmp_path):
+    methods = write_project()
+    keys = [("db", "a"), ("db", "b")]
+    flows = [("biosphere", "ch4")]
+    store = IntensityStore(ScoreCache(tmp_path / "scores.sqlite"))
+    scores = store.scores("db", keys, methods, CountingEngine())
+    inventory = store.flows("db", keys, flows, CountingEngine())
+
+    # later sessions read the unit results from the cache
+    store = IntensityStore(ScoreCache(tmp_path / "scores.sqlite"))
+    engine = CountingEngine()
+    assert np.allclose(store.scores("db", keys, methods, engine), scores)
+    assert np.allclose(store.flows("db", keys, flows, engine), inventory)
+    assert engine.solved == []
@@ -0,0 +1,111 @@
+import brightway2 as bw
+import numpy as np
+
+from lca2rmnd.montecarlo import MatrixSampler, MonteCarloScores, \
+    RunningStats, read_samples
+
+
+def test_running_stats():
+    samples = np.random.default_rng(0).normal(size=(50, 3, 2))
+    stats = RunningStats((3, 2))
+    stats.update(samples[:7])
+    other = RunningStats((3, 2))
+    other.update(samples[7:30])
+    other.update(samples[30:])
+    stats.merge(other)
+
+    assert stats.count == 50
+    assert np.allclose(stats.mean, samples.mean(axis=0))
+    assert np.allclose(stats.std, samples.std(axis=0, ddof=1))
+    assert np.allclose(stats.min, samples.min(axis=0))
+    assert np.allclose(stats.max, samples.max(axis=0))
+
+
+def params(uncertainty_type):
+    # the entry (0, 1) appears twice
+    amounts = np.array([1., 1., 0.2, 0.3])
+    array = np.zeros(4, dtype=[
+        ("row", np.uint32), ("col", np.uint32), ("type", np.uint8),
+        ("uncertainty_type", np.uint8), ("amount", np.float32),
+        ("loc", np.float32), ("scale", np.float32), ("shape", np.float32),
+        ("minimum", np.float32), ("maximum", np.float32),
+        ("negative", bool)])
+    array["row"] = [0, 1, 0, 0]
+    array["col"] = [0, 1, 1, 1]
+    # production and technosphere exchanges, see `bw2data.utils.TYPE_DICTIONARY`
+    array["type"] = [0, 0, 1, 1]
+    array["amount"] = amounts
+    array["uncertainty_type"] = uncertainty_type
+    array["loc"] = amounts if uncertainty_type < 2 else np.log(amounts)
+    array["scale"] = 0.1
+    array["minimum"] = array["maximum"] = np.nan
+    return array
+
+
+def test_matrix_sampler():
+    sampler = MatrixSampler(params(0), (2, 2), technosphere=True, seed=0)
+    assert np.allclose(sampler.sample().toarray(), [[1., -0.5], [0., 1.]])
+
+    sampler = MatrixSampler(params(2), (2, 2), technosphere=True, seed=0)
+    first = sampler.sample().toarray()
+    indices, indptr = sampler.matrix.indices.copy(), \
+        sampler.matrix.indptr.copy()
+    second = sampler.sample()
+
+    # new values in the same matrix
+    assert second is sampler.matrix
+    assert second.nnz == 3
+    assert np.array_equal(second.indices, indices)
+    assert np.array_equal(second.indptr, indptr)
+    assert not np.allclose(second.toarray(), first)
+    assert first[0, 1] < 0 and second[0, 1] < 0
+
+
+def write_project():
+    bw.projects.set_current("lca2rmnd_test_montecarlo")
+    bw.Database("biosphere").write({
+        ("biosphere", "co2"): {"name": "Carbon dioxide", "unit": "kilogram",
+                               "type": "emission"}})
+    bw.Database("db").write({
+        ("db", code): {
+            "name": code, "location": "GLO", "unit": "kilogram",
+            "exchanges": [
+                {"input": ("db", code), "amount": 1., "type": "production"},
+                {"input": ("db", "a"), "amount": amount,
+                 "type": "technosphere", "uncertainty type": 2,
+                 "loc": np.log(amount), "scale": 0.1},
+                {"input": ("biosphere", "co2"), "amount": 2.,
+                 "type": "biosphere", "uncertainty type": 2,
+                 "loc": np.log(2.), "scale": 0.2}]}
+        for code, amount in [("a", 0.1), ("b", 0.5)]})
+    method = ("lca2rmnd test", "climate")
+    bw.Method(method).register()
+    bw.Method(method).write([(("biosphere", "co2"), 1.)])
+    return [method]
+
+
+def test_read_samples(tmp_path):
+    methods = write_project()
+    demands = [{("db", "a"): 1}, {("db", "b"): 2}]
+    labels = [("EUR", "a"), ("EUR", "b")]
+
+    mc = MonteCarloScores(demands, labels, methods, tmp_path, chunksize=3,
+                          scale=0.5)
+    mc.prepare("2030")
+    stats = mc.run(5, 0, "2030")
+    mc.run(4, 1, "2030", offset=5)
+    test_labels, test_methods, samples = read_samples(tmp_path, "2030")
+
+    assert test_labels == labels
+    assert test_methods == methods
+    assert samples.shape == (9, 2, 1)
+    assert np.allclose(samples[:5].mean(axis=0), stats.mean)
+    assert np.allclose(samples[:5].max(axis=0), stats.max)
+
+    # the samples include the scale
+    unscaled = MonteCarloScores(demands, labels, methods, tmp_path,
+                                chunksize=3)
+    unscaled.prepare("unscaled")
+    unscaled.run(5, 0, "unscaled")
+    assert np.allclose(read_samples(tmp_path, "unscaled")[2] * 0.5,
+                       samples[:5])
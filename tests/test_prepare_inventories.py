@@ -0,0 +1,142 @@
+import pytest
+
+pytest.importorskip("premise")
+pytest.importorskip("carculator")
+
+from bw2data.backends.peewee.proxies import ActivityDataset as Act
+from bw2data.backends.peewee.schema import ExchangeDataset as Exc
+from bw2data.utils import merge_databases
+import brightway2 as bw
+import premise
+
+from lca2rmnd import prepare_inventories
+from lca2rmnd.prepare_inventories import create_project, model, \
+    relink_electricity_demand, source_db, split_by_year
+from premise.utils import eidb_label
+
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+import time
+
+remind_regions = [
+    'LAM', 'OAS', 'SSA', 'EUR',
+    'NEU', 'MEA', 'REF', 'CAZ',
+    'CHA', 'IND', 'JPN', 'USA']
+
+
+def test_relink_merged_activities():
+    bw.projects.set_current("lca2rmnd_test_relink")
+    year = 2030
+    eidb = eidb_label(model, "BAU", year)
+    fuel = "electricity market for fuel preparation, {}".format(year)
+    for db in list(bw.databases):
+        del bw.databases[db]
+
+    bw.Database(eidb).write({
+        (eidb, "lv_" + region): {
+            "name": "market group for electricity, low voltage",
+            "location": region, "exchanges": []}
+        for region in remind_regions})
+    # inventories imported to a separate database and merged,
+    # see `load_and_merge`
+    export = "carculator export"
+    bw.Database(export).write({
+        (export, "fuel"): {"name": fuel, "location": "GLO",
+                           "exchanges": []},
+        (export, "bev"): {
+            "name": "Passenger car, BEV, Medium, {}".format(year),
+            "location": "GLO",
+            "exchanges": [
+                {"input": (export, "bev"), "amount": 1.,
+                 "type": "production"},
+                {"input": (export, "fuel"), "amount": 0.2, "name": fuel,
+                 "type": "technosphere"}]}})
+    merge_databases(eidb, export)
+
+    relink_electricity_demand("BAU", year)
+
+    copies = list(Act.select().where(
+        Act.name.startswith("Passenger car") & (Act.location != "GLO")))
+    assert len(copies) == len(remind_regions)
+    for act in copies:
+        assert act.database == eidb
+        assert act.data["database"] == eidb
+        inputs = {(exc.input_database, exc.input_code) for exc in
+                  Exc.select().where(Exc.output_code == act.code)}
+        assert inputs == {(eidb, act.code), (eidb, "lv_" + act.location)}
+    bw.LCA({(eidb, copies[0].code): 1}).lci()
+
+
+class NewDatabase():
+    """Stand-in for `premise.NewDatabase`, recording the calls."""
+    fail = None
+
+    def __init__(self, scenario, year, **kwargs):
+        self.scenario = scenario
+        self.year = year
+
+    def update_all(self):
+        NewDatabase.prepared.append((self.scenario, self.year))
+        if (self.scenario, self.year) == NewDatabase.fail:
+            raise ValueError("Update failed.")
+        time.sleep(0.2)
+
+    def write_db_to_brightway(self):
+        NewDatabase.written.append((self.scenario, self.year))
+
+
+@pytest.fixture
+def new_database(monkeypatch):
+    bw.projects.set_current("lca2rmnd_test_create")
+    bw.Database(source_db).register()
+    NewDatabase.prepared, NewDatabase.written = [], []
+    monkeypatch.setattr(premise, "NewDatabase", NewDatabase)
+    monkeypatch.setattr(NewDatabase, "fail", None)
+    # the stand-in is not available in spawned worker processes,
+    # the databases are prepared in a thread instead
+    monkeypatch.setattr(prepare_inventories, "process_pool",
+                        lambda jobs: ThreadPoolExecutor(1))
+    return NewDatabase
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_create_project(new_database, jobs):
+    create_project("lca2rmnd_test_create", None, [2020, 2030],
+                   ["BAU", "SCP26"], "remind", from_scratch=False, jobs=jobs)
+
+    units = [("BAU", 2020), ("BAU", 2030), ("SCP26", 2020), ("SCP26", 2030)]
+    assert sorted(new_database.prepared) == units
+    assert sorted(new_database.written) == units
+
+
+def test_create_project_failure(new_database):
+    new_database.fail = ("BAU", 2020)
+    with pytest.raises(ValueError):
+        create_project("lca2rmnd_test_create", None, [2020, 2030],
+                       ["BAU", "SCP26"], "remind", from_scratch=False,
+                       jobs=2)
+
+    # the SCP26 databases are cancelled
+    assert new_database.prepared == [("BAU", 2020), ("BAU", 2030)]
+    assert new_database.written == []
+
+
+def test_split_by_year():
+    inv = SimpleNamespace(data=[
+        {"name": "Passenger car, BEV, Medium, 2030"},
+        {"name": "Passenger car, BEV, Medium, 2050"},
+        {"name": "market for electricity, 2040"},
+        {"name": "glider lightweighting"},
+        {"name": "Passenger car, 20300 km"}])
+
+    parts = split_by_year(inv, [2030, 2050])
+
+    assert sorted(parts) == [2030, 2050]
+    assert [ds["name"] for ds in parts[2030].data] == [
+        "Passenger car, BEV, Medium, 2030", "market for electricity, 2040",
+        "glider lightweighting", "Passenger car, 20300 km"]
+    assert [ds["name"] for ds in parts[2050].data] == [
+        "Passenger car, BEV, Medium, 2050", "market for electricity, 2040",
+        "glider lightweighting", "Passenger car, 20300 km"]
+    # the datasets are copied
+    assert parts[2030].data[1] is not inv.data[2]
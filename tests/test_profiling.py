@@ -0,0 +1,47 @@
+import json
+import pickle
+
+from lca2rmnd.profiling import NullProfiler, Profiler
+
+
+def test_summary():
+    prof = Profiler()
+    with prof.phase("report"):
+        for year in [2020, 2030]:
+            with prof.phase("year", year=year):
+                prof.count("lci", 2)
+                with prof.phase("region", region="EUR"):
+                    prof.count("lcia", 3)
+    summary = prof.summary()
+    assert summary["phases"]["year"]["calls"] == 2
+    assert summary["counters"] == {"lci": 4, "lcia": 6}
+    assert summary["breakdown"]["year=2030,region=EUR"]["counters"] \
+        == {"lcia": 3}
+
+
+def test_merge():
+    prof, worker = Profiler(), pickle.loads(pickle.dumps(Profiler()))
+    with worker.phase("year", year=2020):
+        worker.count("lci")
+    prof.merge(pickle.loads(pickle.dumps(worker)))
+    assert prof.summary()["counters"] == {"lci": 1}
+    assert len(prof.events) == 1
+
+
+def test_chrome_trace(tmp_path):
+    prof = Profiler()
+    with prof.phase("solve", year=2020):
+        prof.count("lci")
+    prof.to_chrome_trace(tmp_path / "trace.json")
+    with open(tmp_path / "trace.json") as f:
+        events = json.load(f)["traceEvents"]
+    assert [event["ph"] for event in events] == ["X", "C"]
+    assert events[0]["args"] == {"year": "2020"}
+
+
+def test_null_profiler():
+    prof = NullProfiler()
+    with prof.phase("solve", year=2020):
+        prof.count("lci")
+    prof.merge(pickle.loads(pickle.dumps(prof)))
+    assert not prof.enabled
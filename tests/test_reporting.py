@@ -1,10 +1,19 @@
 
+import pytest
+
+pytest.importorskip("premise")
+
+import numpy as np
 import pandas as pd
 import random
 import brightway2 as bw
 import math
 
-from lca2rmnd.reporting import ElectricityLCAReporting, TransportLCAReporting
+from lca2rmnd.cache import ScoreCache
+from lca2rmnd.engine import LCAEngine
+from lca2rmnd.sink import ResultSink
+from lca2rmnd.reporting import (ElectricityLCAReporting, MultiScenarioReporting,
+                                TransportLCAReporting)
 from premise import InventorySet
 from premise.utils import eidb_label
 
@@ -102,3 +111,153 @@ def test_ldv_endpoint_reporting():
     region = random.choice(remind_regions)
 
     assert test.loc[(yr, region)] > 0
+
+
+def test_multi_scenario_iterative_cache(synthetic_project, tmp_path):
+    project, folder, years, methods = synthetic_project
+    cache = ScoreCache(tmp_path / "scores.sqlite")
+    ms = MultiScenarioReporting(
+        TransportLCAReporting, ["BAU", "SCP26"], years, project, folder,
+        methods, jobs=2, solver="iterative", cache=cache)
+    test = ms.report("report_midpoint")
+
+    ref = TransportLCAReporting(
+        "BAU", years, project, folder, methods).report_midpoint()
+    assert np.allclose(test.loc["BAU"].reindex(ref.index), ref, rtol=1e-6)
+    assert len(cache) > 0
+
+
+def plant_database(name, locations):
+    """Write one power plant per location for each powerplant filter."""
+    from synthetic import powerplants
+
+    bw.Database(name).write({
+        (name, "{}_{}".format(p, location)): {
+            "name": plant, "reference product": "electricity, high voltage",
+            "location": location, "unit": "kilowatt hour", "exchanges": []}
+        for p, plant in enumerate(powerplants) for location in locations})
+    return bw.Database(name)
+
+
+def share_locations(table):
+    return {region: {key[1].rsplit("_", 1)[1] for key in keys}
+            for region, keys in table.groupby("region").key}
+
+
+def test_supplier_share_fallback(synthetic_project):
+    project, folder, years, methods = synthetic_project
+    rep = ElectricityLCAReporting("BAU", years, project, folder, methods)
+    # equal shares
+    rep.production_volumes = {}
+
+    db = plant_database("lca2rmnd_plants", ["US", "RER", "RoW"])
+    table = rep.supplier_share_table(db, ["USA", "SSA"])
+    assert share_locations(table) == {"USA": {"US"}, "SSA": {"RER"}}
+    assert np.allclose(table.groupby(["region", "tech"]).share.sum(), 1)
+
+    db = plant_database("lca2rmnd_plants_row", ["US", "RoW"])
+    table = rep.supplier_share_table(db, ["SSA"])
+    assert share_locations(table) == {"SSA": {"RoW"}}
+
+    # activities, as before the share tables
+    for tech, shares in rep.supplier_shares(db, "USA").items():
+        assert all(act["location"] == "US" for act in shares)
+
+    db = plant_database("lca2rmnd_plants_us", ["US"])
+    with pytest.raises(ValueError):
+        rep.supplier_share_table(db, ["SSA"])
+
+
+def test_contributions(synthetic_project):
+    project, folder, years, methods = synthetic_project
+    rep = TransportLCAReporting("BAU", years, project, folder, methods)
+    test = rep.report_contributions(n=3)
+
+    assert test.index.names == ["year", "region", "method", "kind", "rank"]
+    assert list(test.columns) == ["key", "name", "score"]
+    assert len(test) == len(years) * len(rep.regions) * len(methods) * 2 * 3
+    assert test.name.notna().all()
+    for (year, kind), part in test.groupby(level=["year", "kind"]):
+        databases = {key[0] for key in part.key}
+        if kind == "process":
+            assert databases == {eidb_label(model, "BAU", year)}
+        else:
+            assert databases == {"biosphere3"}
+    # descending absolute scores
+    ranked = test.score.abs().unstack("rank")
+    assert (ranked.diff(axis=1).iloc[:, 1:] <= 0).all().all()
+
+    # all flows add up to the scores of the demands
+    year, region = years[-1], rep.regions[0]
+    flows = rep.report_contributions(n=1000).xs(
+        (year, region, "flow"), level=["year", "region", "kind"])
+    scores = LCAEngine().scores(rep._demands(year)[region], methods)
+    for method, score in zip(methods, scores):
+        assert math.isclose(flows.loc[method].score.sum(), score,
+                            rel_tol=1e-6)
+
+
+def test_materials_cube(synthetic_project, tmp_path):
+    project, folder, years, methods = synthetic_project
+    rep = TransportLCAReporting("BAU", years, project, folder, methods)
+    bioflows, names = rep._material_flow_names()
+    assert len(bioflows) > 2
+    # two flows of the same material, e.g., different ore grades
+    names = [names[0]] + names[:1] + names[2:]
+    rep._material_flow_names = lambda: (bioflows, names)
+
+    test = rep.report_materials_cube()
+
+    assert test.dims == ("year", "region", "material")
+    assert sorted(test.material.values) == sorted(set(names))
+    year, region = years[0], rep.regions[0]
+    flows = rep._material_flows(year, bioflows)[(year, region)] * 1e9
+    assert math.isclose(test.sel(year=year, region=region,
+                                 material=names[0]).item(),
+                        flows[0] + flows[1], rel_tol=1e-9)
+    assert math.isclose(test.sel(year=year, region=region,
+                                 material=names[2]).item(),
+                        flows[2], rel_tol=1e-9)
+
+    # the series and the result sink sum up the flows in the same way
+    series = test.to_series()
+    pd.testing.assert_series_equal(rep.report_materials(), series)
+    sink = ResultSink(tmp_path)
+    rep.report_materials(sink=sink)
+    stored = sink.read("report_materials", "BAU")
+    assert np.allclose(stored.reindex(series.index), series)
+
+
+def test_ldv_sweep(synthetic_project):
+    project, folder, years, methods = synthetic_project
+    rep = TransportLCAReporting("BAU", years, project, folder, methods)
+    ldv = rep.report_LDV_LCA().score_pkm
+    diesel = rep.liq_share["diesel"]
+
+    test = rep.report_LDV_sweep([0., diesel, 1.], [0.5, 1.])
+
+    assert test.dims == ("year", "region", "variable", "method",
+                         "diesel_share", "occupancy")
+    point = test.sel(diesel_share=diesel, occupancy=1.).to_series()
+    ldv.index = ldv.index.set_names(list(point.index.names))
+    assert np.allclose(point.reindex(ldv.index), ldv, rtol=1e-9)
+
+
+def test_tech_cube(synthetic_project):
+    project, folder, years, methods = synthetic_project
+    rep = ElectricityLCAReporting("BAU", years, project, folder, methods)
+    cube = rep.report_tech_LCA_cube(years)
+
+    assert cube.dims == ("year", "region", "tech", "method")
+    year = years[-1]
+    test = rep.report_tech_LCA(year)
+    assert np.allclose(test.score, cube.sel(year=year).to_series(),
+                       equal_nan=True)
+
+    # the same as a separate calculation for each technology
+    db = bw.Database("_".join(["ecoinvent", "BAU", str(year)]))
+    region = rep.regions[0]
+    for tech, shares in rep.supplier_shares(db, region).items():
+        assert np.allclose(
+            cube.sel(year=year, region=region, tech=tech).values,
+            LCAEngine().scores(shares, methods))
@@ -1,4 +1,8 @@
 # content of test_activity_maps.py
+import pytest
+
+pytest.importorskip("premise")
+
 from lca2rmnd.activity_select import ActivitySelector
 
 from premise import InventorySet, Geomap
@@ -49,3 +53,16 @@ def test_filter_powerplants():
         expr = sel.create_expr(**tech_fltr)
         select = sel.select(db_act, expr, ["DE"])
         assert select.count() > 0, "No activities found for {}".format(tech)
+
+
+def test_filter_powerplants_in_memory():
+    sel = ActivitySelector()
+    fltr = InventorySet(db_act).powerplant_filters
+    selected = sel.select_all(db_act, fltr, ["DE"])
+
+    for tech, tech_fltr in fltr.items():
+        expr = sel.create_expr(**tech_fltr)
+        reference = [(a.database, a.code)
+                     for a in sel.select(db_act, expr, ["DE"])]
+        assert sorted(selected[tech]) == sorted(reference), \
+            "Selection differs for {}".format(tech)
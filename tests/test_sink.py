@@ -0,0 +1,28 @@
+import pandas as pd
+
+from lca2rmnd.sink import ResultSink
+
+
+def test_round_trip(tmp_path):
+    methods = [("ReCiPe", "climate change", "GWP100"), ("ReCiPe", "water")]
+    result = {(year, region, method): year + r + m
+              for year in [2030, 2020]
+              for r, region in enumerate(["EUR", "USA"])
+              for m, method in enumerate(methods)}
+    sink = ResultSink(tmp_path)
+    for year in [2030, 2020]:
+        sink.write("report_midpoint", "BAU", ["year", "region", "method"],
+                   {key: value for key, value in result.items()
+                    if key[0] == year})
+
+    series = sink.read("report_midpoint", "BAU")
+    expected = pd.Series(result).sort_index(level=0, sort_remaining=False)
+    assert list(series.index) == list(expected.index)
+    assert (series.values == expected.values).all()
+    assert series.index.names == ["year", "region", "method"]
+    assert len(sink.read("report_midpoint", "BAU", years=[2020])) == 4
+
+    both = sink.read("report_midpoint")
+    assert both.index.names[0] == "Scenario"
+    sink.clear("report_midpoint", "BAU")
+    assert sink.scenarios("report_midpoint") == []